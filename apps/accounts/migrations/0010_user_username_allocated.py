@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-17 18:05
+
+import apps.accounts.models
+import apps.common.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_alter_user_options'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='accounts_us_usernam_c0ea66_idx',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='username',
+            field=apps.common.fields.AllocatedSlugField(always_update=True, editable=False, populate_from=apps.accounts.models.slugify_two_fields, unique=True),
+        ),
+    ]
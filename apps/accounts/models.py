@@ -1,12 +1,12 @@
 import uuid
 from datetime import timedelta
 
-from autoslug import AutoSlugField
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from django.utils import timezone
 
+from apps.common.fields import AllocatedSlugField
 from apps.common.models import IsDeletedModel
 
 from .managers import CustomUserManager
@@ -20,7 +20,7 @@ class User(AbstractBaseUser, IsDeletedModel, PermissionsMixin):
     id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True)
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
-    username = AutoSlugField(
+    username = AllocatedSlugField(
         populate_from=slugify_two_fields, unique=True, always_update=True
     )
     email = models.EmailField(unique=True)
@@ -41,9 +41,6 @@ class User(AbstractBaseUser, IsDeletedModel, PermissionsMixin):
 
     class Meta:
         ordering = ["-created_at"]
-        indexes = [
-            models.Index(fields=["username"]),
-        ]
         permissions = [
             ("can_toggle_user_status", "Can toggle user active status")
         ]
@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from apps.common.cache import invalidate_cache_tags
 from apps.profiles.models import Profile
 
 User = get_user_model()
@@ -10,3 +11,12 @@ User = get_user_model()
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_responses(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no public response shows
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    # Names appear on profiles and as project owners
+    invalidate_cache_tags("profiles", "projects")
@@ -5,7 +5,7 @@ from django.conf import settings
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
-from apps.accounts.models import Otp
+from apps.accounts.models import Otp, User
 from apps.common.errors import ErrorCode
 from apps.common.schema_examples import ERR_RESPONSE_STATUS, SUCCESS_RESPONSE_STATUS
 from apps.common.utils import TestUtil
@@ -75,6 +75,25 @@ class TestAccounts(APITestCase):
 
         self.assertEqual(response.status_code, 422)
 
+    @patch("apps.accounts.emails.SendEmail.send_email")
+    def test_register_allocates_username(self, mock_send_email):
+        for email in ("first@example.com", "second@example.com"):
+            self.client.post(self.register_url, {**valid_data, "email": email})
+
+        first = User.objects.get(email="first@example.com")
+        second = User.objects.get(email="second@example.com")
+        self.assertEqual(
+            [first.username, second.username], ["test-user", "test-user-2"]
+        )
+
+        # The username only moves when the name does
+        second.is_email_verified = True
+        second.save()
+        self.assertEqual(second.username, "test-user-2")
+        second.last_name = "Renamed"
+        second.save()
+        self.assertEqual(second.username, "test-renamed")
+
     def test_login(self):
         # Disabled account - 403
         response = self.client.post(
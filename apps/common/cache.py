@@ -0,0 +1,134 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag, urlencode
+
+TAG_KEY_PREFIX = "cache-tag"
+RESPONSE_KEY_PREFIX = "response"
+
+
+def _tag_key(tag):
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def get_tag_versions(tags):
+    """
+    Current generation of each dependency tag.
+
+    A tag missing from the cache (never set, or evicted) starts a new
+    generation, so entries built against an older one can never be served.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [str(versions[key]) for key in keys]
+
+
+def _bump_tags(tags):
+    cache.set_many({_tag_key(tag): time.time_ns() for tag in tags}, None)
+
+
+def invalidate_cache_tags(*tags):
+    """
+    Start a new generation for the given tags, orphaning every cached
+    response that depends on them.
+
+    The bump is repeated after commit so a response rendered from the old
+    rows while the transaction was open doesn't outlive it.
+    """
+    _bump_tags(tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_tags(tags))
+
+
+def build_response_cache_key(request, tags):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    renderer = getattr(request.accepted_renderer, "format", "")
+    versions = ":".join(get_tag_versions(tags))
+    raw = f"{request.path}?{query}|anon|{renderer}|{versions}"
+    return f"{RESPONSE_KEY_PREFIX}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def cache_anonymous_response(*tags, timeout=None):
+    """
+    Cache successful GET responses served to anonymous users.
+
+    Entries are keyed by path, query string, renderer and the current
+    generation of each dependency tag; `invalidate_cache_tags` (fired from
+    model signals) makes them unreachable. Authenticated requests always hit
+    the view, as responses may differ per user.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            key = build_response_cache_key(request, tags)
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                ttl = timeout or settings.RESPONSE_CACHE_TIMEOUT
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(key, rendered, ttl)
+                )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def conditional_response(last_modified_func):
+    """
+    Answer conditional GETs with `304 Not Modified` before the view runs.
+
+    `last_modified_func(view, request, *args, **kwargs)` returns the newest
+    change to anything in the representation, or None when the object doesn't
+    exist (the view then runs and raises its usual 404). It should be a single
+    cheap query: a matching `If-None-Match` / `If-Modified-Since` skips the
+    view's prefetches and serialization entirely.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            last_modified = last_modified_func(self, request, *args, **kwargs)
+            if last_modified is None:
+                return view_method(self, request, *args, **kwargs)
+
+            # The query string can select a different representation
+            query = urlencode(sorted(request.query_params.lists()), doseq=True)
+            renderer = getattr(request.accepted_renderer, "format", "")
+            raw = f"{last_modified.isoformat()}|{query}|{renderer}"
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+            timestamp = int(last_modified.timestamp())
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                response.headers["ETag"] = etag
+                response.headers["Last-Modified"] = http_date(timestamp)
+                # Clients may keep the body but must revalidate before reuse
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
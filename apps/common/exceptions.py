@@ -115,23 +115,25 @@ def handle_not_found_error(exc):
     )
 
 
-def handle_validation_error(exc):
-    def extract_errors(detail):
-        errors = {}
-        for key, value in detail.items():
-            if isinstance(value, dict):
-                # Recursively process nested fields
-                errors[key] = extract_errors(value)
-            elif isinstance(value, list):
-                errors[key] = str(value[0]).strip() if value else "Unknown error"
-            elif isinstance(value, str):
-                errors[key] = value.strip()
-            else:
-                # Handle unexpected types gracefully
-                errors[key] = "Unexpected error"
-
-        return errors
+def extract_errors(detail):
+    """Flatten serializer errors to the first message per field, recursively."""
+    errors = {}
+    for key, value in detail.items():
+        if isinstance(value, dict):
+            # Recursively process nested fields
+            errors[key] = extract_errors(value)
+        elif isinstance(value, list):
+            errors[key] = str(value[0]).strip() if value else "Unknown error"
+        elif isinstance(value, str):
+            errors[key] = value.strip()
+        else:
+            # Handle unexpected types gracefully
+            errors[key] = "Unexpected error"
+
+    return errors
 
+
+def handle_validation_error(exc):
     # Log the raw validation errors for debugging
     logger.debug(f"Validation error details: {exc.detail}")
 
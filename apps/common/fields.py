@@ -0,0 +1,122 @@
+import re
+
+from autoslug import AutoSlugField
+from autoslug.utils import crop_slug, get_prepopulated_value
+from django.db import models
+from django.db.models import Case, Count, Max, Q, When
+from django.db.models.functions import Cast, Substr
+
+
+class AllocatedSlugField(AutoSlugField):
+    """
+    AutoSlugField that allocates unique slugs without probing one candidate
+    per query.
+
+    A save keeps the current slug while it still derives from the source
+    fields (the base slug, optionally with a numeric suffix), so edits that
+    leave them alone cost no query. Otherwise the next free suffix comes
+    from a single query (see `next_free`), whose prefix match is served by
+    the `varchar_pattern_ops` index Postgres gets for unique slug columns. `allocate` does the same for a batch of
+    unsaved instances, e.g. ahead of a bulk_create.
+
+    `unique_with` is not supported, and fields without `always_update` keep
+    AutoSlugField's behaviour.
+    """
+
+    def allocated_flag(self):
+        return f"_{self.name}_allocated"
+
+    def base_slug(self, instance):
+        value = get_prepopulated_value(self, instance)
+        slug = self.slugify(value) if value else ""
+        return self.slugify(crop_slug(self, slug)) or instance._meta.model_name
+
+    def allocate(self, instances):
+        """
+        Give each instance a unique slug, reading the taken ones in a single
+        query. Like `next_free`, suffixes continue past the highest one in
+        use, and instances sharing a base slug get successive ones.
+        """
+        bases = [self.base_slug(instance) for instance in instances]
+        if not bases:
+            return
+
+        sep = self.index_sep
+        pattern = r"^(%s)(%s[0-9]+)?$" % (
+            "|".join(re.escape(base) for base in set(bases)),
+            re.escape(sep),
+        )
+        prefixes = Q()
+        for base in set(bases):
+            prefixes |= Q(**{f"{self.name}__startswith": base})
+        rivals = self.model._base_manager.filter(
+            prefixes, **{f"{self.name}__regex": pattern}
+        )
+        taken = set(rivals.values_list(self.name, flat=True))
+        top_index = {}
+        for slug in taken:
+            base, _, index = slug.rpartition(sep)
+            if index.isdigit():
+                top_index[base] = max(top_index.get(base, 1), int(index))
+
+        for instance, base in zip(instances, bases):
+            slug = base
+            while slug in taken:
+                index = top_index[base] = top_index.get(base, 1) + 1
+                tail = f"{sep}{index}"
+                slug = base[: self.max_length - len(tail)] + tail
+            taken.add(slug)
+            setattr(instance, self.attname, slug)
+            setattr(instance, self.allocated_flag(), True)
+
+    def derives_from(self, slug, base):
+        suffix = re.escape(self.index_sep) + "[0-9]+"
+        return re.fullmatch(re.escape(base) + f"({suffix})?", slug) is not None
+
+    def next_free(self, instance, base):
+        """
+        `base` if no other row uses it, else `base` with a suffix one past the
+        highest one in use, read in a single query.
+        """
+        sep = self.index_sep
+        suffixed = Q(
+            **{f"{self.name}__regex": rf"^{re.escape(base + sep)}[0-9]{{1,9}}$"}
+        )
+        rivals = self.model._base_manager.filter(
+            **{f"{self.name}__startswith": base}
+        ).exclude(pk=instance.pk)
+        taken = rivals.aggregate(
+            base_taken=Count("pk", filter=Q(**{self.name: base})),
+            # CASE keeps the cast away from slugs that aren't base + suffix
+            top_index=Max(
+                Case(
+                    When(
+                        suffixed,
+                        then=Cast(
+                            Substr(self.name, len(base + sep) + 1),
+                            models.IntegerField(),
+                        ),
+                    )
+                )
+            ),
+        )
+        if not taken["base_taken"]:
+            return base
+
+        tail = f"{sep}{max(taken['top_index'] or 1, 1) + 1}"
+        if len(base) + len(tail) > self.max_length:
+            return self.next_free(instance, base[: self.max_length - len(tail)])
+        return base + tail
+
+    def pre_save(self, instance, add):
+        if instance.__dict__.pop(self.allocated_flag(), False):
+            return getattr(instance, self.attname)
+        if not self.always_update or self.unique_with:
+            return super().pre_save(instance, add)
+
+        base = self.base_slug(instance)
+        slug = getattr(instance, self.attname)
+        if add or not (slug and self.derives_from(slug, base)):
+            slug = self.next_free(instance, base) if self.unique else base
+            setattr(instance, self.attname, slug)
+        return slug
@@ -0,0 +1,109 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import Exists, F, OuterRef, Subquery
+from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import SearchFilter
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Ranked Postgres full-text search over a stored, GIN-indexed SearchVectorField.
+
+    Views set `search_vector_field` (defaults to "search_vector") and
+    `search_config` to match the config the vector was built with. The
+    `?search=` term is parsed with websearch syntax, so quoted phrases,
+    `or` and `-exclusions` work as users expect. Results are ordered by rank.
+    """
+
+    search_type = "websearch"
+
+    def get_search_vector_field(self, view):
+        return getattr(view, "search_vector_field", "search_vector")
+
+    def get_search_config(self, view):
+        return getattr(view, "search_config", None)
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return queryset
+
+        vector_field = self.get_search_vector_field(view)
+        query = SearchQuery(
+            term, config=self.get_search_config(view), search_type=self.search_type
+        )
+
+        return (
+            queryset.filter(**{vector_field: query})
+            .annotate(search_rank=SearchRank(F(vector_field), query))
+            .order_by("-search_rank", "-created")
+        )
+
+
+class TrigramFilter(filters.CharFilter):
+    """
+    Typo-tolerant match on a text column using pg_trgm word similarity.
+
+    The `<%` operator is served by a `gin_trgm_ops` index on the column, so the
+    filter stays index-backed. `threshold` tightens the match further and should
+    not be lower than `pg_trgm.word_similarity_threshold` (0.6 by default),
+    since the operator has already discarded anything below that.
+
+    Results are annotated with a similarity score (e.g. `tags_name_similarity`
+    for "tags__name") and ordered by it.
+    `field_name` may follow one relation (e.g. "tags__name"); the match then
+    runs as an EXISTS so rows are not duplicated per matching related row.
+    """
+
+    def __init__(self, *args, threshold=0.6, **kwargs):
+        self.threshold = threshold
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        value = value.strip()
+        similarity_name = f"{self.field_name.replace('__', '_')}_similarity"
+        relation, _, column = self.field_name.rpartition("__")
+
+        if not relation:
+            return (
+                qs.annotate(
+                    **{similarity_name: TrigramWordSimilarity(value, column)}
+                )
+                .filter(
+                    **{
+                        f"{column}__trigram_word_similar": value,
+                        f"{similarity_name}__gte": self.threshold,
+                    }
+                )
+                .order_by(f"-{similarity_name}")
+            )
+
+        field = qs.model._meta.get_field(relation)
+        matches = (
+            field.related_model.objects.filter(
+                **{
+                    field.related_query_name(): OuterRef("pk"),
+                    f"{column}__trigram_word_similar": value,
+                }
+            )
+            .annotate(similarity=TrigramWordSimilarity(value, column))
+            .filter(similarity__gte=self.threshold)
+        )
+        return (
+            qs.filter(Exists(matches))
+            .annotate(
+                **{
+                    similarity_name: Subquery(
+                        matches.order_by("-similarity").values("similarity")[:1]
+                    )
+                }
+            )
+            .order_by(f"-{similarity_name}")
+        )
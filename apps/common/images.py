@@ -0,0 +1,196 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Formats accepted from clients, and the format each one is stored as
+UPLOAD_FORMATS = {
+    "JPEG": "JPEG",
+    "MPO": "JPEG",  # multi-picture JPEGs from phone cameras
+    "PNG": "PNG",
+    "WEBP": "WEBP",
+    "GIF": "PNG",
+}
+EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                thread_name_prefix="image-variants",
+            )
+    return _executor
+
+
+def _encode(image, image_format, quality=85):
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def prepare_upload(upload):
+    """
+    Validate an uploaded image and downscale it to IMAGE_MAX_DIMENSION.
+
+    Returns a ContentFile ready to assign to an ImageField, re-encoded
+    without EXIF data (orientation is applied first). Raises a
+    ValidationError for oversized, unreadable or unsupported files.
+    """
+    if upload.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        limit = settings.IMAGE_MAX_UPLOAD_SIZE // (1024 * 1024)
+        raise serializers.ValidationError(f"Image must be at most {limit} MB.")
+
+    try:
+        with Image.open(upload) as image:
+            image.verify()
+        upload.seek(0)
+        image = Image.open(upload)
+        image_format = UPLOAD_FORMATS.get(image.format)
+        if image_format is None:
+            raise serializers.ValidationError("Upload a JPEG, PNG, WebP or GIF image.")
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((settings.IMAGE_MAX_DIMENSION,) * 2)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise serializers.ValidationError("Upload a valid image.")
+
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    return ContentFile(
+        _encode(image, image_format), name=f"{stem}.{EXTENSIONS[image_format]}"
+    )
+
+
+def variants_field_name(field_name):
+    return f"{field_name}_variants"
+
+
+def generate_variants(model, pk, field_name, stored_name, content):
+    """
+    Write the IMAGE_VARIANTS renditions of an image as WebP and record their
+    storage names on the instance.
+
+    The instance is only updated if it still holds `stored_name`; a newer
+    upload wins and this run's files are removed. Saving through the model
+    lets the usual post_save receivers invalidate caches.
+    """
+    field = model._meta.get_field(field_name)
+    stem = os.path.splitext(os.path.basename(stored_name))[0]
+    folder = os.path.dirname(stored_name)
+
+    variants = {}
+    with Image.open(BytesIO(content)) as image:
+        image.load()
+        for name, size in settings.IMAGE_VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((size, size))
+            path = os.path.join(folder, "variants", f"{stem}_{name}.webp")
+            variants[name] = field.storage.save(
+                path, ContentFile(_encode(variant, "WEBP", quality=80))
+            )
+
+    instance = model._base_manager.filter(pk=pk, **{field_name: stored_name}).first()
+    if instance is None:
+        for path in variants.values():
+            field.storage.delete(path)
+        return
+
+    attname = variants_field_name(field_name)
+    setattr(instance, attname, variants)
+    # Bump auto_now timestamps too, so HTTP validators change with the URLs
+    touched = [
+        f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)
+    ]
+    instance.save(update_fields=[attname, *touched])
+
+
+def _run_generate_variants(*args):
+    try:
+        generate_variants(*args)
+    except Exception:
+        logger.exception("Image variant generation failed")
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(instance, field_name, upload):
+    """
+    Generate the variants of the image just saved on `instance` from the
+    prepared `upload`, once the transaction commits: on the worker pool, or
+    inline when IMAGE_WORKERS is 0.
+    """
+    args = (
+        type(instance),
+        instance.pk,
+        field_name,
+        getattr(instance, field_name).name,
+        upload.file.getvalue(),
+    )
+
+    def submit():
+        if settings.IMAGE_WORKERS:
+            get_executor().submit(_run_generate_variants, *args)
+        else:
+            generate_variants(*args)
+
+    transaction.on_commit(submit)
+
+
+def delete_files_on_commit(storage, paths):
+    paths = list(paths)
+    if paths:
+        transaction.on_commit(lambda: [storage.delete(path) for path in paths])
+
+
+class ImageUploadMixin:
+    """
+    ModelSerializer mixin for endpoints that replace the image in
+    `image_field`. The serializer's `validate_<image_field>` should run the
+    upload through `prepare_upload`.
+
+    Replacing (or clearing) the image drops the old variants right away, so
+    stale renditions are never served; the new ones are scheduled once the
+    row is saved.
+    """
+
+    image_field = None
+
+    def update(self, instance, validated_data):
+        variants_field = variants_field_name(self.image_field)
+        upload = validated_data.get(self.image_field)
+        stale = {}
+        if self.image_field in validated_data:
+            stale = getattr(instance, variants_field) or {}
+            validated_data[variants_field] = {}
+
+        instance = super().update(instance, validated_data)
+
+        storage = instance._meta.get_field(self.image_field).storage
+        delete_files_on_commit(storage, stale.values())
+        if upload:
+            schedule_variants(instance, self.image_field, upload)
+        return instance
+
+
+def variant_urls(instance, field_name):
+    field = instance._meta.get_field(field_name)
+    variants = getattr(instance, variants_field_name(field_name)) or {}
+    return {name: field.storage.url(path) for name, path in variants.items()}
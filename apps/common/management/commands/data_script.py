@@ -347,7 +347,6 @@ class CreateData:
                             created_count += 1
                             review_created = True
                             has_reviewed.append(reviewer)
-                            project.review_percentage
                             logger.info(
                                 f"Created review for project '{project.title}' by {reviewer.user.email}"
                             )
@@ -401,7 +400,6 @@ class CreateData:
                         )
                         created_count += 1
                         review_created = True
-                        project.review_percentage
                         logger.info(
                             f"Created review for project '{project.title}' by {reviewer.user.email}"
                         )
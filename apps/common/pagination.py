@@ -1,12 +1,191 @@
-from django.core.paginator import InvalidPage
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from rest_framework.exceptions import NotFound
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 from apps.common.responses import CustomResponse
 
 
-class CustomPagination(PageNumberPagination):
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids an exact COUNT(*) over large result sets.
+
+    Results up to PAGINATION_EXACT_COUNT_THRESHOLD rows are counted exactly
+    (filtered lists with a bounded `COUNT(*) ... LIMIT threshold + 1`). Beyond
+    that the total is the planner's estimate: `pg_class.reltuples` for an
+    unfiltered table, the EXPLAIN row estimate otherwise. Table estimates are
+    cached for PAGINATION_COUNT_CACHE_TTL seconds. `count_is_approximate`
+    tells the caller which kind of total it got.
+
+    An estimate may fall short of the real total, so with one, pages past
+    the estimated last page are served as long as they have rows.
+    """
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        if queryset.query.where or queryset.query.is_sliced:
+            count, self.count_is_approximate = self.filtered_count(queryset)
+            return count
+
+        # Only estimates are cached; an exact total would go stale on write
+        cache_key = f"pagination-estimate:{queryset.model._meta.label_lower}"
+        estimate = cache.get(cache_key)
+        if estimate is not None:
+            self.count_is_approximate = True
+            return estimate
+
+        count, self.count_is_approximate = self.table_count(queryset)
+        if self.count_is_approximate and settings.PAGINATION_COUNT_CACHE_TTL:
+            cache.set(cache_key, count, settings.PAGINATION_COUNT_CACHE_TTL)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Past an estimated last page; page() checks for rows instead
+            if self.count_is_approximate and int(number) > self.num_pages:
+                return int(number)
+            raise
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+
+        # Don't cut the slice at the estimate, which may be short
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom : bottom + self.per_page]
+        if number > self.num_pages:
+            object_list = list(object_list)
+            if not object_list:
+                raise EmptyPage(self.error_messages["no_results"])
+        return self._get_page(object_list, number, self)
+
+    def table_count(self, queryset):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table has been analyzed
+        estimate = row[0] if row else -1
+        if estimate > settings.PAGINATION_EXACT_COUNT_THRESHOLD:
+            return estimate, True
+        return queryset.count(), False
+
+    def filtered_count(self, queryset):
+        threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+        bounded = queryset.order_by()[: threshold + 1].count()
+        if bounded <= threshold:
+            return bounded, False
+
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return max(int(plan[0]["Plan"]["Plan Rows"]), bounded), True
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination on a stable ordering.
+
+    Pages are fetched with `WHERE created < <cursor position>` instead of
+    OFFSET and no COUNT(*) is run, so deep pages cost the same as the first.
+    Views can override the ordering with a `cursor_ordering` attribute.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created", "id")
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, "cursor_ordering", None) or self.ordering
+
+
+class CursorModeMixin:
+    """
+    Lets clients of a page-number paginator opt into keyset pagination with
+    `?pagination=cursor`. The `next`/`previous` links carry an opaque `cursor`
+    and keep the mode, so clients just follow them. Page-number mode is
+    unchanged for clients that need page numbers and totals.
+
+    Cursor mode always orders by the keyset ordering, so relevance-ranked
+    search results should be paged by number.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+    pagination_mode_query_param = "pagination"
+    cursor_pagination_class = KeysetPagination
+
+    cursor_paginator = None
+
+    def use_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.pagination_mode_query_param) == "cursor"
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def get_cursor_paginator(self):
+        paginator = self.cursor_pagination_class()
+        if self.page_size:
+            paginator.page_size = self.page_size
+        paginator.page_size_query_param = self.page_size_query_param
+        paginator.max_page_size = self.max_page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor_mode(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_cursor_pagination_data(self, data):
+        return {
+            "next": self.cursor_paginator.get_next_link(),
+            "previous": self.cursor_paginator.get_previous_link(),
+            "results": data,
+            "per_page": self.cursor_paginator.page_size,
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                "name": self.pagination_mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for keyset pagination without totals.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": self.cursor_pagination_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from a previous `next`/`previous` link.",
+                "schema": {"type": "string"},
+            },
+        ]
+        return parameters
+
+
+class CustomPagination(CursorModeMixin, PageNumberPagination):
     """
     Paginate a queryset if required, either returning a
     page object, or `None` if pagination is not configured for this view.
@@ -18,6 +197,10 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
     def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor_mode(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+
         page_size = self.get_page_size(request)
         if not page_size:
             return None
@@ -40,15 +223,19 @@ class CustomPagination(PageNumberPagination):
         """
         Customize the paginated response to include metadata.
         """
-        pagination_data = {
-            "count": self.page.paginator.count,
-            "next": self.get_next_link(),
-            "previous": self.get_previous_link(),
-            "results": data,  # The serialized page data
-            "per_page": self.page.paginator.per_page,
-            "current_page": self.page.number,
-            "last_page": self.page.paginator.num_pages,
-        }
+        if self.cursor_paginator:
+            pagination_data = self.get_cursor_pagination_data(data)
+        else:
+            pagination_data = {
+                "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,  # The serialized page data
+                "per_page": self.page.paginator.per_page,
+                "current_page": self.page.number,
+                "last_page": self.page.paginator.num_pages,
+            }
         return CustomResponse.success(
             message="Paginated data retrieved successfully.",
             data=pagination_data,
@@ -56,14 +243,18 @@ class CustomPagination(PageNumberPagination):
         )
 
 
-class DefaultPagination(PageNumberPagination):
+class DefaultPagination(CursorModeMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
 
     def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return Response(data=self.get_cursor_pagination_data(data), status=200)
+
         data = {
             "count": self.page.paginator.count,
+            "count_is_approximate": self.page.paginator.count_is_approximate,
             "next": self.get_next_link(),
             "previous": self.get_previous_link(),
             "results": data,
@@ -1,3 +1,6 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
 from rest_framework import serializers
 
 from apps.common.errors import ErrorCode
@@ -32,3 +35,120 @@ class PaginatedResponseDataSerializer(serializers.Serializer):
     per_page = serializers.IntegerField()
     current_page = serializers.IntegerField()
     last_page = serializers.IntegerField()
+
+
+def parse_field_names(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin that lets clients pick the fields they need with
+    `?fields=a,b` or drop some with `?exclude=c`, read from the request in
+    the serializer context. Only the top-level serializer is pruned; nested
+    serializers always render in full.
+
+    `prepare_queryset` makes the query match: columns read only by dropped
+    fields are deferred and their relations are neither joined nor
+    prefetched. `Meta.field_lookups` maps an output field to what it reads,
+    as model lookups or Prefetch objects; other fields read the column named
+    by their source, if there is one. Columns listed in
+    `Meta.deferred_columns` are never rendered and always deferred.
+    """
+
+    @classmethod
+    def selected_fields(cls, request):
+        names = list(cls.Meta.fields)
+        if request is None:
+            return names
+
+        fields = parse_field_names(request.query_params.get("fields"))
+        exclude = parse_field_names(request.query_params.get("exclude"))
+        unknown = (fields | exclude) - set(names)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Unknown field(s): {', '.join(sorted(unknown))}."}
+            )
+        return [
+            name
+            for name in names
+            if (not fields or name in fields) and name not in exclude
+        ]
+
+    @classmethod
+    def field_reads(cls, name):
+        lookups = getattr(cls.Meta, "field_lookups", {})
+        if name in lookups:
+            return lookups[name]
+
+        declared = cls._declared_fields.get(name)
+        source = getattr(declared, "source", None) or name
+        try:
+            cls.Meta.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return []
+        return [source]
+
+    @classmethod
+    def prepare_queryset(cls, queryset, request, prefix=""):
+        """
+        Join, prefetch and defer for the fields requested by `request`.
+
+        `prefix` is the to-one lookup from the queryset's model to the
+        serialized one, for querysets of rows that link to it.
+        """
+        opts = cls.Meta.model._meta
+        selected = set(cls.selected_fields(request))
+        path = f"{prefix}{LOOKUP_SEP}" if prefix else ""
+
+        needed, dropped = set(), set()
+        select_related = [prefix] if prefix else []
+        prefetch_related = []
+        for name in cls.Meta.fields:
+            for lookup in cls.field_reads(name):
+                if isinstance(lookup, Prefetch):
+                    if name in selected:
+                        prefetch_related.append(
+                            Prefetch(
+                                path + lookup.prefetch_through,
+                                queryset=lookup.queryset,
+                                to_attr=lookup.to_attr,
+                            )
+                        )
+                    continue
+
+                column = lookup.split(LOOKUP_SEP)[0]
+                if name not in selected:
+                    dropped.add(column)
+                    continue
+
+                needed.add(column)
+                field = opts.get_field(column)
+                if field.many_to_many or field.one_to_many:
+                    prefetch_related.append(path + lookup)
+                elif field.is_relation:
+                    select_related.append(path + lookup)
+
+        dropped.update(getattr(cls.Meta, "deferred_columns", ()))
+        deferred = [
+            path + column
+            for column in sorted(dropped - needed)
+            if opts.get_field(column).concrete
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.root
+        if root is self or (
+            root is self.parent and isinstance(root, serializers.ListSerializer)
+        ):
+            selected = self.selected_fields(self.context.get("request"))
+            fields = {name: fields[name] for name in selected}
+        return fields
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The broker configured in INBOX_BROKER, created once per process."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            options = dict(settings.INBOX_BROKER)
+            backend = import_string(options.pop("BACKEND"))
+            _broker = backend(**{key.lower(): value for key, value in options.items()})
+    return _broker
+
+
+class InMemoryBroker:
+    """
+    Pub/sub within one process. Subscribers are asyncio queues; publishing is
+    thread-safe, so sync views can publish to subscribers on the event loop.
+    Only suitable for a single worker (and tests).
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:  # the subscriber's loop has closed
+                pass
+
+    def subscribe(self, channel):
+        """An async context manager yielding a subscription with `get()`."""
+        return _QueueSubscription(self, channel)
+
+
+class _QueueSubscription:
+    # Plain async context managers rather than @asynccontextmanager: a stream
+    # that is dropped rather than closed is finalized in arbitrary order, and
+    # a nested generator may already be closed by the time it would clean up.
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.broker.queue_size)
+        with self.broker._lock:
+            self.broker._subscribers[self.channel].add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        subscribers = self.broker._subscribers
+        with self.broker._lock:
+            subscribers[self.channel].discard(self)
+            if not subscribers[self.channel]:
+                del subscribers[self.channel]
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Dropped an inbox event for a slow subscriber")
+
+    async def get(self, timeout=None):
+        """The next message, or None if none arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """
+    Pub/sub over Redis channels, shared by every worker and host connected to
+    the same server. Messages are sent as JSON.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        # Connects lazily; the pool is shared by the threads publishing
+        self._client = redis.Redis.from_url(location)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+    def subscribe(self, channel):
+        """An async context manager yielding a subscription with `get()`."""
+        return _RedisSubscription(self.location, channel)
+
+
+class _RedisSubscription:
+    def __init__(self, location, channel):
+        self.location = location
+        self.channel = channel
+
+    async def __aenter__(self):
+        self.client = aioredis.Redis.from_url(self.location)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        try:
+            await self.pubsub.unsubscribe(self.channel)
+        finally:
+            await self.pubsub.aclose()
+            await self.client.aclose()
+
+    async def get(self, timeout=None):
+        """The next message, or None if none arrives within `timeout` seconds."""
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        return json.loads(message["data"]) if message else None
@@ -0,0 +1,35 @@
+import logging
+
+from apps.messaging.broker import get_broker
+from apps.messaging.serializers import MessageSerializer
+from apps.profiles.models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+def inbox_channel(profile_id):
+    return f"inbox:{profile_id}"
+
+
+def publish_new_message(message):
+    """
+    Push a message that was just sent to its recipient's open inbox streams,
+    with their new unread count. A broker failure is logged, not raised: the
+    message is already stored and shows up in the inbox either way.
+    """
+    unread_count = (
+        Profile.objects.filter(pk=message.recipient_id)
+        .values_list("unread_message_count", flat=True)
+        .first()
+    )
+    event = {
+        "event": "message",
+        "data": {
+            "message": MessageSerializer(message).data,
+            "unread_count": unread_count or 0,
+        },
+    }
+    try:
+        get_broker().publish(inbox_channel(message.recipient_id), event)
+    except Exception:
+        logger.exception("Publishing an inbox event failed")
@@ -0,0 +1,119 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.messaging.managers import SEARCH_CONFIG
+from apps.messaging.models import Message
+from apps.profiles.models import Profile
+
+SORT_NODE = re.compile(r"\bSort\b")
+INDEX_NODE = re.compile(r"(?:Scan using|Bitmap Index Scan on) (\w+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds synthetic messages in a transaction that is rolled back, then "
+        "prints the plan and timing of the inbox, unread-count, sent-mail and "
+        "inbox search queries. Use -v 2 to print the full plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=100_000,
+            help="Number of synthetic messages to seed.",
+        )
+        parser.add_argument(
+            "--profiles",
+            type=int,
+            default=100,
+            help="Number of synthetic profiles the messages are spread over.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            profile = self.seed(options["messages"], options["profiles"])
+            self.report(profile, options["verbosity"])
+            transaction.set_rollback(True)
+
+    def seed(self, message_count, profile_count):
+        User = get_user_model()
+        users = [
+            User.objects.create(
+                first_name="Benchmark",
+                last_name=f"user{i}",
+                email=f"benchmark-user{i}@example.com",
+            )
+            for i in range(profile_count)
+        ]
+        profiles = list(Profile.objects.filter(user__in=users))
+
+        Message.objects.bulk_create(
+            (
+                Message(
+                    sender=profiles[(i + 1) % len(profiles)],
+                    recipient=profiles[i % len(profiles)],
+                    name="Benchmark",
+                    email="benchmark@example.com",
+                    subject=f"Message {i % 97}",
+                    body="Synthetic message.",
+                    is_read=i % 5 != 0,
+                )
+                for i in range(message_count)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create sends no signals
+        Message.objects.filter(recipient__in=profiles).update_search_vector()
+        with connection.cursor() as cursor:
+            # Spread the seeded messages over a year so the ordering has work
+            # to do; only they are rewritten, so real rows are never locked
+            cursor.execute(
+                f"UPDATE {Message._meta.db_table} "
+                "SET created = now() - random() * interval '365 days' "
+                "WHERE recipient_id = ANY(%s)",
+                [[profile.pk for profile in profiles]],
+            )
+            cursor.execute(f"ANALYZE {Message._meta.db_table}")
+        return profiles[0]
+
+    def report(self, profile, verbosity):
+        inbox = Message.objects.filter(recipient=profile)[:10]
+        unread = (
+            Message.objects.filter(recipient=profile, is_read=False)
+            .order_by()
+            .values("pk")
+        )
+        sent = Message.objects.filter(sender=profile).order_by("-created")[:10]
+        search = Message.objects.filter(
+            recipient=profile,
+            search_vector=SearchQuery("message 7", config=SEARCH_CONFIG),
+        )
+
+        unread_sql, unread_params = unread.query.sql_with_params()
+        queries = {
+            "inbox": inbox.query.sql_with_params(),
+            "unread count": (f"SELECT COUNT(*) FROM ({unread_sql}) u", unread_params),
+            "sent": sent.query.sql_with_params(),
+            "search": search.query.sql_with_params(),
+        }
+        for name, (sql, params) in queries.items():
+            plan = self.explain(sql, params)
+            timing = re.search(r"Execution Time: ([\d.]+) ms", plan)
+            indexes = ",".join(dict.fromkeys(INDEX_NODE.findall(plan))) or "-"
+            self.stdout.write(
+                f"{name}: sort={'yes' if SORT_NODE.search(plan) else 'no'} "
+                f"indexes={indexes} "
+                f"time={timing.group(1) if timing else '?'}ms"
+            )
+            if verbosity > 1:
+                self.stdout.write(plan)
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN ANALYZE {sql}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
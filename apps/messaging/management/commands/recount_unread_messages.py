@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconciles the per-profile unread-message counters with the messages "
+        "table. Meant to run periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of profiles checked per UPDATE.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        profile_ids = Profile.objects.values_list("id", flat=True).iterator(
+            chunk_size=batch_size
+        )
+
+        corrected = 0
+        batch = []
+        for profile_id in profile_ids:
+            batch.append(profile_id)
+            if len(batch) == batch_size:
+                corrected += Profile.objects.filter(
+                    pk__in=batch
+                ).recount_unread_messages()
+                batch = []
+
+        if batch:
+            corrected += Profile.objects.filter(pk__in=batch).recount_unread_messages()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Corrected {corrected} unread-message counters.")
+        )
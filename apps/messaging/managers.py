@@ -0,0 +1,73 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+
+SEARCH_CONFIG = "english"
+
+
+class MessageQuerySet(models.QuerySet):
+    def build_search_vector(self):
+        """
+        Weighted search document: subject (A) > sender's name and email (B) >
+        body (C).
+        """
+        return (
+            SearchVector("subject", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("name", "email", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("body", weight="C", config=SEARCH_CONFIG)
+        )
+
+    def update_search_vector(self):
+        """Recompute the stored search document for every message in the queryset."""
+        return self.update(search_vector=self.build_search_vector())
+
+    def _per_recipient(self):
+        """The queryset split into one queryset per recipient."""
+        recipient_ids = self.order_by().values_list("recipient_id", flat=True)
+        return [
+            (recipient_id, self.filter(recipient_id=recipient_id))
+            for recipient_id in recipient_ids.distinct()
+        ]
+
+    def _set_read(self, is_read):
+        Profile = self.model._meta.get_field("recipient").related_model
+        delta = -1 if is_read else 1
+        changed = 0
+        with transaction.atomic():
+            for recipient_id, messages in self._per_recipient():
+                # The row count of a conditional UPDATE is exact even when
+                # another request flips the same messages concurrently
+                count = messages.filter(is_read=not is_read).update(is_read=is_read)
+                if count and recipient_id is not None:
+                    Profile.objects.filter(pk=recipient_id).apply_unread_delta(
+                        delta * count
+                    )
+                changed += count
+        return changed
+
+    def mark_read(self):
+        """
+        Mark the messages as read with one UPDATE per recipient and take them
+        off the unread counters. Returns how many changed.
+        """
+        return self._set_read(True)
+
+    def mark_unread(self):
+        """
+        Mark the messages as unread with one UPDATE per recipient and add them
+        to the unread counters. Returns how many changed.
+        """
+        return self._set_read(False)
+
+    def bulk_delete(self):
+        """
+        Delete the messages, taking the unread ones off the counters with one
+        UPDATE per recipient first. Returns how many were deleted.
+
+        The rows are locked up front, so the read state delete() fetches for
+        the post_delete signals can't change before the rows are gone.
+        """
+        with transaction.atomic():
+            list(self.select_for_update().values_list("pk", flat=True))
+            self.mark_read()
+            _, deleted = self.delete()
+        return deleted.get(self.model._meta.label, 0)
@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-17 18:25
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_CONFIG = "english"
+
+
+def populate_search_vector(apps, schema_editor):
+    Message = apps.get_model("messaging", "Message")
+    Message.objects.update(
+        search_vector=SearchVector("subject", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("name", "email", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("body", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_message_inbox_indexes'),
+        ('profiles', '0016_profile_unread_message_count'),
+    ]
+
+    operations = [
+        BtreeGinExtension(),
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['recipient', 'search_vector'], name='message_search'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
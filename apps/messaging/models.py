@@ -1,27 +1,65 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from apps.profiles.models import Profile
 from apps.common.models import BaseModel
 
+from .managers import MessageQuerySet
+
 
 class Message(BaseModel):
+    # Both foreign keys are served by the composite indexes below
     sender = models.ForeignKey(
-        Profile, on_delete=models.SET_NULL, null=True, blank=True
+        Profile, on_delete=models.SET_NULL, null=True, blank=True, db_index=False
     )
     recipient = models.ForeignKey(
-        Profile, on_delete=models.SET_NULL, null=True, related_name="messages"
+        Profile,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="messages",
+        db_index=False,
     )
     name = models.CharField(_("Name"), max_length=200)
     email = models.EmailField(_("Email"), max_length=200)
     subject = models.CharField(_("Subject"), max_length=200)
     body = models.TextField(_("Body"))
     is_read = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = MessageQuerySet.as_manager()
 
     def __str__(self):
         return self.subject
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so an edit can adjust the unread counter
+        instance._loaded_is_read = dict(zip(field_names, values)).get("is_read")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The unread counter is updated from post_save, inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["is_read", "-created"]
         indexes = [
             models.Index(fields=["created"]),
+            # Inbox pages: a recipient's messages in the default ordering
+            models.Index(
+                fields=["recipient", "is_read", "-created"], name="message_inbox"
+            ),
+            # Unread counts, only over the (small) unread part of the table
+            models.Index(
+                fields=["recipient"],
+                name="message_unread",
+                condition=models.Q(is_read=False),
+            ),
+            # Sent messages, newest first
+            models.Index(fields=["sender", "-created"], name="message_sent"),
+            # Inbox search; btree_gin lets one index match recipient and terms
+            GinIndex(fields=["recipient", "search_vector"], name="message_search"),
         ]
@@ -62,6 +62,64 @@ INBOX_RESPONSE_EXAMPLE = {
     401: UNAUTHORIZED_USER_RESPONSE,
 }
 
+UNREAD_COUNT_RESPONSE_EXAMPLE = {
+    200: OpenApiResponse(
+        description="Unread Count Fetched",
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Unread count retrieved successfully.",
+                    "data": {"unread_count": 2},
+                },
+            ),
+        ],
+    ),
+    401: UNAUTHORIZED_USER_RESPONSE,
+}
+
+STREAM_TICKET_RESPONSE_EXAMPLE = {
+    201: OpenApiResponse(
+        description="Stream Ticket Issued",
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Stream ticket issued successfully.",
+                    "data": {
+                        "ticket": "eyJwcm9maWxlIjoiZTI5ODVkYWMifQ:1tAbCd:x9Yz",
+                        "expires_in": 30,
+                    },
+                },
+            ),
+        ],
+    ),
+    401: UNAUTHORIZED_USER_RESPONSE,
+}
+
+MESSAGE_BULK_ACTION_RESPONSE_EXAMPLE = {
+    200: OpenApiResponse(
+        description="Messages Updated",
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Messages updated successfully.",
+                    "data": {"count": 3},
+                },
+            ),
+        ],
+    ),
+    401: UNAUTHORIZED_USER_RESPONSE,
+    422: OpenApiResponse(
+        response=ErrorDataResponseSerializer,
+        description="Validation Error",
+    ),
+}
+
 VIEW_MESSAGE_RESPONSE_EXAMPLE = {
     200: OpenApiResponse(
         description="Message Retrieval Successful",
@@ -21,3 +21,39 @@ class MessageSerializer(serializers.ModelSerializer):
             "created",
         ]
         read_only_fields = ["sender", "created", "is_read"]
+
+
+class MessageBulkActionSerializer(serializers.Serializer):
+    ACTIONS = ("mark_read", "mark_unread", "delete")
+
+    action = serializers.ChoiceField(choices=ACTIONS)
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=500,
+        required=False,
+    )
+    all = serializers.BooleanField(
+        default=False, help_text="Apply the action to the whole inbox."
+    )
+
+    def validate(self, attrs):
+        if bool(attrs.get("ids")) == attrs["all"]:
+            raise serializers.ValidationError(
+                {"ids": "Provide either a list of message ids or all=true."}
+            )
+        return attrs
+
+    def save(self, **kwargs):
+        """Apply the action to the selected inbox messages; returns the count."""
+        recipient = self.context["request"].user.profile
+        messages = Message.objects.filter(recipient=recipient)
+        if not self.validated_data["all"]:
+            messages = messages.filter(pk__in=self.validated_data["ids"])
+
+        action = self.validated_data["action"]
+        if action == "delete":
+            return messages.bulk_delete()
+        if action == "mark_unread":
+            return messages.mark_unread()
+        return messages.mark_read()
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.messaging.events import publish_new_message
+from apps.messaging.models import Message
+from apps.profiles.models import Profile
+
+
+SEARCH_SOURCE_FIELDS = {"subject", "body", "name", "email"}
+
+
+@receiver(post_save, sender=Message)
+def refresh_message_search_vector(sender, instance, update_fields=None, **kwargs):
+    # Skip saves that can't change the search document (e.g. read state)
+    if update_fields is not None and not SEARCH_SOURCE_FIELDS & set(update_fields):
+        return
+    Message.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Message)
+def update_unread_counter_on_message_save(sender, instance, created, **kwargs):
+    recipients = Profile.objects.filter(pk=instance.recipient_id)
+    previous = getattr(instance, "_loaded_is_read", None)
+
+    if created:
+        if not instance.is_read:
+            recipients.apply_unread_delta(1)
+    elif previous is not None and previous != instance.is_read:
+        recipients.apply_unread_delta(1 if previous else -1)
+
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    if created and instance.recipient_id is not None:
+        transaction.on_commit(lambda: publish_new_message(instance))
+
+
+@receiver(post_delete, sender=Message)
+def update_unread_counter_on_message_delete(sender, instance, **kwargs):
+    is_read = getattr(instance, "_loaded_is_read", None)
+    if is_read is None:
+        is_read = instance.is_read
+    if not is_read:
+        Profile.objects.filter(pk=instance.recipient_id).apply_unread_delta(-1)
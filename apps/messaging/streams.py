@@ -0,0 +1,140 @@
+import json
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.common.errors import ErrorCode
+from apps.common.schema_examples import ERR_RESPONSE_STATUS
+from apps.messaging.broker import get_broker
+from apps.messaging.events import inbox_channel
+from apps.profiles.models import Profile
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+TICKET_SALT = "apps.messaging.streams.ticket"
+
+
+def issue_ticket(profile_id, expires_at):
+    """
+    A signed, single-use ticket that opens the profile's inbox stream within
+    INBOX_STREAM_TICKET_TTL seconds. The stream it opens ends at `expires_at`.
+    """
+    payload = {
+        "profile": str(profile_id),
+        "exp": expires_at,
+        "nonce": secrets.token_urlsafe(16),
+    }
+    return signing.dumps(payload, salt=TICKET_SALT)
+
+
+async def redeem_ticket(ticket):
+    """The ticket's payload, or None if it is forged, expired or already used."""
+    try:
+        payload = signing.loads(
+            ticket, salt=TICKET_SALT, max_age=settings.INBOX_STREAM_TICKET_TTL
+        )
+    except signing.BadSignature:
+        return None
+    # add() only succeeds for the first use of a nonce
+    first_use = await cache.aadd(
+        f"inbox-stream-ticket:{payload['nonce']}",
+        True,
+        settings.INBOX_STREAM_TICKET_TTL,
+    )
+    return payload if first_use else None
+
+
+def unauthorized(message, code):
+    return JsonResponse(
+        {"status": ERR_RESPONSE_STATUS, "message": message, "code": code},
+        status=401,
+    )
+
+
+class InboxStreamView(View):
+    """
+    Server-sent events for the authenticated user's inbox: a `message` event
+    for every message they receive, with their new unread count.
+
+    Runs under ASGI without holding a worker thread. The access token goes in
+    the Authorization header. EventSource can't send headers, so browsers
+    open the stream with `?ticket=` instead, using a single-use ticket from
+    the stream ticket endpoint; the access token never ends up in a URL. The
+    stream ends with an `expired` event when the access token does; clients
+    reconnect with a fresh one. Idle streams get a comment every
+    INBOX_STREAM_HEARTBEAT seconds so proxies keep them open.
+    """
+
+    authentication = JWTAuthentication()
+
+    async def authenticate(self, request):
+        """The (profile id, expiry) for the Authorization header, if any."""
+        header = self.authentication.get_header(request)
+        raw_token = self.authentication.get_raw_token(header) if header else None
+        if not raw_token:
+            return None, None
+        token = self.authentication.get_validated_token(raw_token)
+        user = await sync_to_async(self.authentication.get_user)(token)
+        profile_id = await (
+            Profile.objects.filter(user=user).values_list("pk", flat=True).afirst()
+        )
+        return profile_id, token["exp"]
+
+    async def get(self, request):
+        ticket = request.GET.get("ticket")
+        if ticket:
+            payload = await redeem_ticket(ticket)
+            if payload is None:
+                return unauthorized(
+                    "Stream ticket is invalid, expired or already used.",
+                    ErrorCode.INVALID_TOKEN,
+                )
+            profile_id, expires_at = payload["profile"], payload["exp"]
+        else:
+            try:
+                profile_id, expires_at = await self.authenticate(request)
+            except InvalidToken:
+                return unauthorized(
+                    "Token is Invalid or Expired.", ErrorCode.INVALID_TOKEN
+                )
+            except AuthenticationFailed as exc:
+                return unauthorized(str(exc.detail), ErrorCode.UNAUTHORIZED)
+        if profile_id is None:
+            return unauthorized(
+                "Authentication credentials were not provided.", ErrorCode.UNAUTHORIZED
+            )
+
+        response = StreamingHttpResponse(
+            self.events(profile_id, expires_at), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let nginx buffer events
+        return response
+
+    async def events(self, profile_id, expires_at):
+        heartbeat = settings.INBOX_STREAM_HEARTBEAT
+        async with get_broker().subscribe(inbox_channel(profile_id)) as subscription:
+            # Sent once subscribed, so nothing published after it is missed
+            yield format_event("ready", {})
+            while True:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield format_event("expired", {})
+                    return
+                event = await subscription.get(timeout=min(heartbeat, remaining))
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield format_event(event["event"], event["data"])
@@ -1,7 +1,17 @@
+import asyncio
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
 from apps.common.utils import TestUtil
 from apps.messaging.models import Message
+from apps.messaging.views import MessageRetrieveDestroyView
+from apps.profiles.models import Profile
 
 
 class TestMessages(APITestCase):
@@ -9,6 +19,10 @@ class TestMessages(APITestCase):
     inbox_url = "/api/v1/messages/inbox/"
     retrieve_del_message_url = "/api/v1/messages/{id}/"
     create_message_url = "/api/v1/messages/{username}/"
+    unread_count_url = "/api/v1/messages/unread-count/"
+    bulk_url = "/api/v1/messages/bulk/"
+    stream_url = "/api/v1/messages/stream/"
+    stream_ticket_url = "/api/v1/messages/stream/ticket/"
 
     def setUp(self):
         # Create verified users
@@ -46,6 +60,215 @@ class TestMessages(APITestCase):
         # Test that the correct number of unread messages is returned.
         self.assertEqual(response.data["data"]["unread_count"], 1)
 
+        # Cursor mode keeps the envelope and unread count
+        response = self.client.get(self.inbox_url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, 200)
+        data = response.data["data"]
+        self.assertIsNone(data["next"])
+        self.assertEqual(len(data["results"]["results"]), 1)
+        self.assertEqual(data["results"]["unread_count"], 1)
+
+    def test_unread_count(self):
+        def unread_count():
+            response = self.client.get(self.unread_count_url)
+            self.assertEqual(response.status_code, 200)
+            return response.data["data"]["unread_count"]
+
+        response = self.client.get(self.unread_count_url)
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+        self.assertEqual(unread_count(), 1)
+
+        # Incoming messages add to it; reading one takes it off only once
+        url = self.create_message_url.format(username=self.user1.username)
+        self.client.force_authenticate(user=None)
+        data = {"name": "Anon", "email": "a@example.com", "subject": "S", "body": "B"}
+        self.client.post(url, data)
+        self.client.post(url, data)
+        self.client.force_authenticate(user=self.user1)
+        self.assertEqual(unread_count(), 3)
+
+        url = self.retrieve_del_message_url.format(id=self.message1.id)
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(unread_count(), 2)
+
+        # Deleting a read message leaves it alone, an unread one doesn't
+        self.client.delete(url)
+        self.assertEqual(unread_count(), 2)
+        unread = Message.objects.filter(recipient=self.user1.profile).first()
+        self.client.delete(self.retrieve_del_message_url.format(id=unread.id))
+        self.assertEqual(unread_count(), 1)
+
+        # A message read between the fetch and the delete is only counted once
+        get_object = MessageRetrieveDestroyView.get_object
+
+        def get_then_read(view, id):
+            message = get_object(view, id)
+            Message.objects.filter(pk=id).mark_read()
+            return message
+
+        unread = Message.objects.filter(recipient=self.user1.profile).first()
+        with patch.object(MessageRetrieveDestroyView, "get_object", get_then_read):
+            response = self.client.delete(
+                self.retrieve_del_message_url.format(id=unread.id)
+            )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(unread_count(), 0)
+
+        # The reconcile job fixes counters that drifted
+        Profile.objects.filter(user=self.user1).update(unread_message_count=7)
+        out = StringIO()
+        call_command("recount_unread_messages", stdout=out)
+        self.assertIn("Corrected 1 ", out.getvalue())
+        self.assertEqual(unread_count(), 0)
+
+    def test_message_bulk_actions(self):
+        messages = [
+            Message.objects.create(
+                recipient=self.user1.profile,
+                name="Anon",
+                email="a@example.com",
+                subject=f"Subject {i}",
+                body="Test message",
+            )
+            for i in range(3)
+        ]
+        ids = [str(message.id) for message in messages]
+
+        def unread_count():
+            return Profile.objects.get(user=self.user1).unread_message_count
+
+        response = self.client.post(self.bulk_url, {"action": "mark_read", "all": True})
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+        self.assertEqual(unread_count(), 4)
+
+        # Other users' messages are left alone
+        data = {"action": "mark_read", "ids": ids[:2] + [str(self.message2.id)]}
+        response = self.client.post(self.bulk_url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["count"], 2)
+        self.assertEqual(unread_count(), 2)
+        self.message2.refresh_from_db()
+        self.assertFalse(self.message2.is_read)
+
+        # Already-read messages don't count twice
+        data = {"action": "mark_read", "all": True}
+        response = self.client.post(self.bulk_url, data, format="json")
+        self.assertEqual(response.data["data"]["count"], 2)
+        self.assertEqual(unread_count(), 0)
+
+        data = {"action": "mark_unread", "ids": ids}
+        response = self.client.post(self.bulk_url, data, format="json")
+        self.assertEqual(response.data["data"]["count"], 3)
+        self.assertEqual(unread_count(), 3)
+
+        data = {"action": "delete", "ids": ids[1:]}
+        response = self.client.post(self.bulk_url, data, format="json")
+        self.assertEqual(response.data["data"]["count"], 2)
+        self.assertEqual(unread_count(), 1)
+        remaining = Message.objects.filter(recipient=self.user1.profile)
+        self.assertEqual(remaining.count(), 2)
+
+        # Exactly one of ids and all
+        for data in (
+            {"action": "delete"},
+            {"action": "delete", "all": True, "ids": ids},
+            {"action": "archive", "all": True},
+        ):
+            response = self.client.post(self.bulk_url, data, format="json")
+            self.assertEqual(response.status_code, 422)
+
+    def test_inbox_search(self):
+        def create(recipient, subject, body):
+            return Message.objects.create(
+                recipient=recipient,
+                name="Ada Lovelace",
+                email="ada@example.com",
+                subject=subject,
+                body=body,
+            )
+
+        body_match = create(self.user1.profile, "Hello", "About the Django meetup")
+        subject_match = create(self.user1.profile, "Django meetup", "See you")
+        create(self.user2.profile, "Django meetup", "Not for user1")
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.inbox_url, {"search": "django meetup"})
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]["results"]
+        # Ranked, subject matches first, and never another recipient's mail
+        self.assertEqual(
+            [message["id"] for message in results],
+            [str(subject_match.id), str(body_match.id)],
+        )
+
+        # The sender's name and email are searchable too
+        response = self.client.get(self.inbox_url, {"search": "lovelace"})
+        self.assertEqual(len(response.data["data"]["results"]), 2)
+
+    async def test_inbox_stream(self):
+        response = await self.async_client.get(self.stream_url)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            self.stream_url, headers={"Authorization": "Bearer invalid"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        # Access tokens are no longer accepted in the query string
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user1)))()
+        response = await self.async_client.get(self.stream_url, {"token": token})
+        self.assertEqual(response.status_code, 401)
+
+        # Browsers open the stream with a single-use ticket instead
+        response = await self.async_client.post(self.stream_ticket_url)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post(
+            self.stream_ticket_url, headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 201)
+        ticket = response.json()["data"]["ticket"]
+        response = await self.async_client.get(self.stream_url, {"ticket": "forged"})
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(self.stream_url, {"ticket": ticket})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b"event: ready\ndata: {}\n\n")
+
+        def send_message():
+            url = self.create_message_url.format(username=self.user1.username)
+            data = {"name": "Anon", "email": "a@example.com", "subject": "Hi"}
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {**data, "body": "Pushed"})
+
+        await sync_to_async(send_message)()
+        event = (await asyncio.wait_for(anext(events), 5)).decode()
+        name, data = event.strip().split("\n")
+        self.assertEqual(name, "event: message")
+        data = json.loads(data.removeprefix("data: "))
+        self.assertEqual(data["message"]["body"], "Pushed")
+        self.assertEqual(data["unread_count"], 2)
+        await events.aclose()
+
+        # A ticket opens one stream only
+        response = await self.async_client.get(self.stream_url, {"ticket": ticket})
+        self.assertEqual(response.status_code, 401)
+
+    def test_inbox_query_plan(self):
+        out = StringIO()
+        call_command("benchmark_inbox", messages=5000, profiles=50, stdout=out)
+        results = dict(
+            line.split(": ", 1) for line in out.getvalue().splitlines()
+        )
+        # The indexes hand the rows over already in the inbox/sent ordering
+        self.assertTrue(results["inbox"].startswith("sort=no"), results)
+        self.assertTrue(results["sent"].startswith("sort=no"), results)
+
     def test_message_get(self):
         # Test that unauthenticated users receive a 401 error.
         url = self.retrieve_del_message_url.format(id=self.message1.id)
@@ -1,9 +1,13 @@
 from django.urls import path
 
-from . import views
+from . import streams, views
 
 urlpatterns = [
     path("inbox/", views.InboxGenericView.as_view()),
+    path("unread-count/", views.UnreadCountView.as_view()),
+    path("bulk/", views.MessageBulkActionView.as_view()),
+    path("stream/", streams.InboxStreamView.as_view()),
+    path("stream/ticket/", views.StreamTicketView.as_view()),
     path("<uuid:id>/", views.MessageRetrieveDestroyView.as_view()),
     path("<str:username>/", views.CreateMessage.as_view()),
 ]
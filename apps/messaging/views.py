@@ -1,37 +1,53 @@
+from django.conf import settings
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.common.exceptions import NotFoundError
+from apps.common.filters import FullTextSearchFilter
 from apps.common.pagination import CustomPagination
 from apps.common.responses import CustomResponse
+from apps.messaging.managers import SEARCH_CONFIG
 from apps.messaging.permissions import IsMessageOwner
 from apps.messaging.schema_examples import (
     CREATE_MESSAGE_RESPONSE_EXAMPLE,
     DELETE_MESSAGE_RESPONSE_EXAMPLE,
     INBOX_RESPONSE_EXAMPLE,
+    MESSAGE_BULK_ACTION_RESPONSE_EXAMPLE,
+    STREAM_TICKET_RESPONSE_EXAMPLE,
+    UNREAD_COUNT_RESPONSE_EXAMPLE,
     VIEW_MESSAGE_RESPONSE_EXAMPLE,
 )
+from apps.messaging.streams import issue_ticket
 from apps.profiles.models import Profile
 
 from .models import Message
-from .serializers import MessageSerializer
+from .serializers import MessageBulkActionSerializer, MessageSerializer
 
 tags = ["Messages"]
 
 
+def get_unread_count(user):
+    """The user's maintained unread counter: one indexed row, no COUNT."""
+    unread_count = (
+        Profile.objects.filter(user=user)
+        .values_list("unread_message_count", flat=True)
+        .first()
+    )
+    return unread_count or 0
+
+
 # View for listing inbox messages
 class InboxGenericView(ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = MessageSerializer
     pagination_class = CustomPagination
-    filter_backends = [SearchFilter]
-    search_fields = ["subject", "body"]
+    filter_backends = [FullTextSearchFilter]
+    search_config = SEARCH_CONFIG
 
     @extend_schema(
         summary="Retrieve user's inbox messages",
@@ -43,7 +59,10 @@ class InboxGenericView(ListAPIView):
         parameters=[
             OpenApiParameter(
                 name="search",
-                description="Search messages by (e.g., subject or body).",
+                description=(
+                    "Search messages by subject, sender name or email, and body. "
+                    "Results are ranked, subject matches first."
+                ),
             ),
         ],
         responses=INBOX_RESPONSE_EXAMPLE,
@@ -56,7 +75,10 @@ class InboxGenericView(ListAPIView):
         """
         Return the filtered queryset of messages for the authenticated user.
         """
-        return Message.objects.filter(recipient=self.request.user.profile)
+        # Search always runs within one recipient's messages
+        return Message.objects.filter(recipient=self.request.user.profile).defer(
+            "search_vector"
+        )
 
     def list(self, request, *args, **kwargs):
         """
@@ -65,7 +87,7 @@ class InboxGenericView(ListAPIView):
         queryset = self.filter_queryset(self.get_queryset())  # Apply filters
         page = self.paginate_queryset(queryset)
 
-        unread_count = self.get_queryset().filter(is_read=False).count()  # Unread count
+        unread_count = get_unread_count(request.user)
 
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -87,6 +109,67 @@ class InboxGenericView(ListAPIView):
         )
 
 
+class UnreadCountView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        summary="Retrieve the number of unread messages",
+        description="This endpoint allows authenticated users to get the number of unread messages in their inbox, e.g. for a notification badge. The count is maintained as messages arrive and are read or deleted, so it is cheap to poll.",
+        tags=tags,
+        responses=UNREAD_COUNT_RESPONSE_EXAMPLE,
+    )
+    def get(self, request):
+        return CustomResponse.success(
+            message="Unread count retrieved successfully.",
+            data={"unread_count": get_unread_count(request.user)},
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class StreamTicketView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        summary="Get a ticket for the inbox event stream",
+        description="This endpoint allows authenticated users to get a single-use ticket for opening `/messages/stream/` with `?ticket=`, for clients such as EventSource that can't send an Authorization header. The ticket must be used within `expires_in` seconds, and the stream it opens ends when the access token used here expires.",
+        tags=tags,
+        request=None,
+        responses=STREAM_TICKET_RESPONSE_EXAMPLE,
+    )
+    def post(self, request):
+        ticket = issue_ticket(request.user.profile.pk, request.auth["exp"])
+        return CustomResponse.success(
+            message="Stream ticket issued successfully.",
+            data={"ticket": ticket, "expires_in": settings.INBOX_STREAM_TICKET_TTL},
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
+class MessageBulkActionView(APIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = MessageBulkActionSerializer
+
+    @extend_schema(
+        summary="Mark several messages read or unread, or delete them",
+        description="This endpoint allows authenticated users to mark messages in their inbox as read or unread, or delete them, in one request. Select the messages with a list of `ids` or with `all: true` for the whole inbox. Ids of messages that are not in the user's inbox are ignored; the response gives the number of messages affected.",
+        tags=tags,
+        request=MessageBulkActionSerializer,
+        responses=MESSAGE_BULK_ACTION_RESPONSE_EXAMPLE,
+    )
+    def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        count = serializer.save()
+
+        return CustomResponse.success(
+            message="Messages updated successfully.",
+            data={"count": count},
+            status_code=status.HTTP_200_OK,
+        )
+
+
 class MessageRetrieveDestroyView(APIView):
     permission_classes = (IsAuthenticated, IsMessageOwner)
     serializer_class = MessageSerializer
@@ -115,8 +198,8 @@ class MessageRetrieveDestroyView(APIView):
 
         # Mark the message as read if it's currently unread
         if not message.is_read:
+            Message.objects.filter(pk=message.pk).mark_read()
             message.is_read = True
-            message.save()
 
         return CustomResponse.success(
             message="Message retrieved successfully.",
@@ -132,7 +215,8 @@ class MessageRetrieveDestroyView(APIView):
     )
     def delete(self, request, id):
         message = self.get_object(id)
-        message.delete()
+        # Settles the unread counter from the row, not the fetched instance
+        Message.objects.filter(pk=message.pk).bulk_delete()
         return Response(
             status=status.HTTP_204_NO_CONTENT,
         )
@@ -162,8 +246,8 @@ class ViewMessage(APIView):
 
         # Mark the message as read if it's currently unread
         if not message.is_read:
+            Message.objects.filter(pk=message.pk).mark_read()
             message.is_read = True
-            message.save()
 
         return CustomResponse.success(
             message="Message retrieved successfully.",
@@ -225,7 +309,7 @@ class DeleteMessage(APIView):
         except Message.DoesNotExist:
             raise NotFoundError(err_msg="Message not found.")
 
-        message.delete()
+        Message.objects.filter(pk=message.pk).bulk_delete()
         return Response(
             status=status.HTTP_204_NO_CONTENT,
         )
@@ -1,11 +1,17 @@
 from django.contrib import admin
-from .models import ProfileSkill, Skill, Profile
+from .models import Location, ProfileSkill, Skill, Profile
 
 class SkillAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     readonly_fields = ('id',)
     list_per_page = 10
     
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('city', 'country', 'profile_count')
+    search_fields = ('city', 'country')
+    readonly_fields = ('id', 'profile_count')
+    list_per_page = 10
+
 class ProfileSkillAdmin(admin.ModelAdmin):
     search_fields = ('skill__name',)
     readonly_fields = ('id',)
@@ -21,6 +27,7 @@ class ProfileAdmin(admin.ModelAdmin):
     
     
 admin.site.register(Skill, SkillAdmin)
+admin.site.register(Location, LocationAdmin)
 admin.site.register(Profile, ProfileAdmin)
 admin.site.register(ProfileSkill, ProfileSkillAdmin)
 
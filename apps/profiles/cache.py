@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PROFILE_KEY_PREFIX = "profile"
+GENERATION_KEY_PREFIX = "profile-generation"
+
+
+def _generation_key(username):
+    return f"{GENERATION_KEY_PREFIX}:{username}"
+
+
+def profile_cache_key(username, generation):
+    return f"{PROFILE_KEY_PREFIX}:{username}:{generation}"
+
+
+def get_profile_generation(username):
+    """
+    Current generation of a username's cache entry. A missing one (never
+    set, or evicted) starts a new generation, like `get_tag_versions`.
+    """
+    key = _generation_key(username)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_cached_profile(username):
+    """
+    The cached `{"data", "last_modified"}` entry for a username if any, and
+    the generation a fresh entry must be stored under.
+
+    Read the generation before the rows a fresh entry is built from, so an
+    invalidation in between leaves that entry unreachable.
+    """
+    generation = get_profile_generation(username)
+    return cache.get(profile_cache_key(username, generation)), generation
+
+
+def cache_profile(username, generation, data, last_modified):
+    entry = {"data": dict(data), "last_modified": last_modified}
+    cache.set(
+        profile_cache_key(username, generation), entry, settings.PROFILE_CACHE_TIMEOUT
+    )
+    return entry
+
+
+def _bump_generations(keys):
+    cache.set_many({key: time.time_ns() for key in keys}, None)
+
+
+def invalidate_profiles(*usernames):
+    """
+    Start a new generation for the given usernames, orphaning their cached
+    profiles.
+
+    Like `invalidate_cache_tags`, the bump is repeated after commit: a view
+    that read the old rows while the transaction was open stores its entry
+    under the generation it started with, which is then no longer current.
+    """
+    keys = [_generation_key(username) for username in usernames if username]
+    if not keys:
+        return
+    _bump_generations(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_generations(keys))
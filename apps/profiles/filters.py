@@ -1,11 +1,35 @@
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
 
+from apps.common.filters import TrigramFilter
+from apps.profiles.locations import parse_location
 from apps.profiles.models import Profile
 
+
+class LocationFilter(filters.CharFilter):
+    """
+    Matches profiles whose canonical location is the one the text normalizes
+    to, as indexed equalities on the location table. A bare city matches it
+    in every country, and a bare country every city in it.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        city, country = parse_location(value)
+        lookups = {}
+        if city:
+            lookups[f"{self.field_name}__city"] = city
+        if country:
+            lookups[f"{self.field_name}__country"] = country
+        return qs.filter(**lookups) if lookups else qs.none()
+
+
 class ProfileFilter(filters.FilterSet):
-    location = filters.CharFilter(lookup_expr='icontains')
-    skills = filters.CharFilter(field_name='skills__name', lookup_expr='icontains')  
+    location = LocationFilter(field_name="canonical_location")
+    skills = TrigramFilter(field_name='skills__name')
 
     class Meta:
         model = Profile
-        fields = ['skills', 'location']
\ No newline at end of file
+        fields = ['skills', 'location']
@@ -0,0 +1,120 @@
+import re
+
+COUNTRIES = [
+    "Algeria",
+    "Argentina",
+    "Australia",
+    "Austria",
+    "Bangladesh",
+    "Belgium",
+    "Benin",
+    "Botswana",
+    "Brazil",
+    "Cameroon",
+    "Canada",
+    "Chile",
+    "China",
+    "Colombia",
+    "Denmark",
+    "Egypt",
+    "Ethiopia",
+    "Finland",
+    "France",
+    "Germany",
+    "Ghana",
+    "India",
+    "Indonesia",
+    "Ireland",
+    "Israel",
+    "Italy",
+    "Ivory Coast",
+    "Japan",
+    "Kenya",
+    "Malawi",
+    "Malaysia",
+    "Mexico",
+    "Morocco",
+    "Mozambique",
+    "Namibia",
+    "Netherlands",
+    "New Zealand",
+    "Niger",
+    "Nigeria",
+    "Norway",
+    "Pakistan",
+    "Philippines",
+    "Poland",
+    "Portugal",
+    "Rwanda",
+    "Senegal",
+    "Singapore",
+    "South Africa",
+    "South Korea",
+    "Spain",
+    "Sweden",
+    "Switzerland",
+    "Tanzania",
+    "Togo",
+    "Tunisia",
+    "Turkey",
+    "Uganda",
+    "Ukraine",
+    "United Arab Emirates",
+    "United Kingdom",
+    "United States",
+    "Vietnam",
+    "Zambia",
+    "Zimbabwe",
+]
+
+# Lowercase spellings and codes people use -> canonical country name. Two
+# letter codes that read as US states or provinces (e.g. "ca") are left out.
+COUNTRY_ALIASES = {
+    **{country.lower(): country for country in COUNTRIES},
+    "cote d ivoire": "Ivory Coast",
+    "england": "United Kingdom",
+    "gb": "United Kingdom",
+    "great britain": "United Kingdom",
+    "holland": "Netherlands",
+    "ke": "Kenya",
+    "ng": "Nigeria",
+    "nig": "Nigeria",
+    "rsa": "South Africa",
+    "scotland": "United Kingdom",
+    "the netherlands": "Netherlands",
+    "uae": "United Arab Emirates",
+    "uk": "United Kingdom",
+    "united states of america": "United States",
+    "us": "United States",
+    "usa": "United States",
+    "wales": "United Kingdom",
+    "za": "South Africa",
+}
+LONGEST_ALIAS = max(len(alias.split()) for alias in COUNTRY_ALIASES)
+
+
+def parse_location(text):
+    """
+    Split a free-text location into a canonical `(city, country)` pair.
+
+    "Lagos", "lagos, NG" and "Lagos Nigeria" give ("Lagos", "") and
+    ("Lagos", "Nigeria") twice. With commas, the first part is the city and
+    the last one the country; otherwise a known country name is looked for at
+    the end of the text. Either half may be empty.
+    """
+    text = re.sub(r"[^\w\s,]+", " ", (text or "").lower()).replace("_", " ")
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return "", ""
+
+    if len(parts) > 1:
+        country = parts[-1]
+        return parts[0].title(), COUNTRY_ALIASES.get(country, country.title())
+
+    words = parts[0].split()
+    for size in range(min(LONGEST_ALIAS, len(words)), 0, -1):
+        country = COUNTRY_ALIASES.get(" ".join(words[-size:]))
+        if country:
+            return " ".join(words[:-size]).title(), country
+    return parts[0].title(), ""
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.cache import invalidate_cache_tags
+from apps.profiles.models import SimilarProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the similar-profiles table from profile skills. By default "
+        "only profiles whose skills changed since the last run are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every profile, refreshing all skill weights.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=256,
+            help="Number of profiles scored per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if options["full"]:
+            total = SimilarProfile.objects.rebuild(batch_size=batch_size)
+        else:
+            total = SimilarProfile.objects.refresh_stale(batch_size=batch_size)
+
+        # The links are bulk written, without signals
+        if total:
+            invalidate_cache_tags("profiles")
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt similar profiles for {total} profiles.")
+        )
@@ -0,0 +1,387 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+from django.db.models import Count, F, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Now
+
+from .locations import parse_location
+from .similarity import SkillVectors
+
+SEARCH_CONFIG = "english"
+
+
+class SkillQuerySet(models.QuerySet):
+    def ensure(self, names):
+        """
+        Map each skill name to its id, creating the missing skills.
+
+        Existing names are skipped by the insert rather than looked up first,
+        so a skill created concurrently can't make this fail.
+        """
+        if not names:
+            return {}
+        self.bulk_create(
+            [self.model(name=name) for name in names], ignore_conflicts=True
+        )
+        return dict(self.filter(name__in=names).values_list("name", "pk"))
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Skills whose name starts with `prefix`, most used first.
+
+        Names are stored lowercase, so the case-sensitive `LIKE 'prefix%'` is
+        served by the `varchar_pattern_ops` index Postgres keeps alongside the
+        unique index on name; ranking reads the maintained `profile_count`
+        rather than counting ProfileSkill rows.
+        """
+        return self.filter(name__startswith=prefix.strip().lower()).order_by(
+            "-profile_count", "name"
+        )[:limit]
+
+    def apply_profile_delta(self, delta):
+        """Shift the denormalized profile counters in a single UPDATE."""
+        return self.update(profile_count=F("profile_count") + delta)
+
+    def recount_profiles(self):
+        """Rebuild the profile counters from the profile/skill links."""
+        ProfileSkill = self.model._meta.get_field("profileskill").related_model
+        counts = (
+            ProfileSkill.objects.filter(skill=OuterRef("pk"))
+            .order_by()
+            .values("skill")
+            .annotate(c=Count("pk"))
+            .values("c")
+        )
+        return self.update(profile_count=Coalesce(Subquery(counts), 0))
+
+
+class LocationQuerySet(models.QuerySet):
+    def resolve(self, text):
+        """
+        The canonical location for a free-text one, created if it is new.
+        A bare city joins the only place already known under that name, and
+        the first place created under a name absorbs its bare city.
+        """
+        city, country = parse_location(text)
+        if not city and not country:
+            return None
+        if not country:
+            matches = list(self.filter(city=city).exclude(country="")[:2])
+            if len(matches) == 1:
+                return matches[0]
+        with transaction.atomic():
+            location, created = self.get_or_create(city=city, country=country)
+            if created and city and country:
+                self.absorb_bare_city(location)
+        return location
+
+    def absorb_bare_city(self, location):
+        """
+        Move the profiles of the bare city named like `location` over to it
+        and drop that row, unless the name is shared by another country.
+        """
+        places = self.filter(city=location.city).exclude(country="")
+        if places.exclude(pk=location.pk).exists():
+            return
+        bare = self.filter(city=location.city, country="").first()
+        if bare is None:
+            return
+        Profile = self.model._meta.get_field("profiles").related_model
+        moved = Profile.objects.filter(canonical_location=bare).update(
+            canonical_location=location
+        )
+        self.filter(pk=location.pk).apply_profile_delta(moved)
+        bare.delete()
+
+    def apply_profile_delta(self, delta):
+        """Shift the denormalized profile counters in a single UPDATE."""
+        return self.update(profile_count=F("profile_count") + delta)
+
+    def recount_profiles(self):
+        """Rebuild the profile counters from the profiles pointing at them."""
+        Profile = self.model._meta.get_field("profiles").related_model
+        counts = (
+            Profile.objects.filter(canonical_location=OuterRef("pk"))
+            .order_by()
+            .values("canonical_location")
+            .annotate(c=Count("pk"))
+            .values("c")
+        )
+        return self.update(profile_count=Coalesce(Subquery(counts), 0))
+
+
+class ProfileQuerySet(models.QuerySet):
+    def build_search_vector(self):
+        """
+        Weighted search document: user's name (A) > skill names (B) >
+        short intro (C) > bio and location (D). Postgres has four weights,
+        so location shares the lowest one with bio.
+
+        Names and skills come from correlated subqueries so the vector can be
+        written with a single UPDATE.
+        """
+        User = self.model._meta.get_field("user").related_model
+        Skill = self.model._meta.get_field("skills").related_model
+
+        full_name = Subquery(
+            User._base_manager.filter(pk=OuterRef("user_id"))
+            .annotate(full_name=Concat("first_name", Value(" "), "last_name"))
+            .values("full_name")[:1]
+        )
+        skill_names = Subquery(
+            Skill.objects.filter(profiles=OuterRef("pk"))
+            .values("profiles")
+            .annotate(names=StringAgg("name", delimiter=" "))
+            .values("names")[:1]
+        )
+        return (
+            SearchVector(full_name, weight="A", config=SEARCH_CONFIG)
+            + SearchVector(skill_names, weight="B", config=SEARCH_CONFIG)
+            + SearchVector("short_intro", weight="C", config=SEARCH_CONFIG)
+            + SearchVector("bio", "location", weight="D", config=SEARCH_CONFIG)
+        )
+
+    def update_search_vector(self):
+        """Recompute the stored search document for every profile in the queryset."""
+        return self.update(search_vector=self.build_search_vector())
+
+    def apply_unread_delta(self, delta):
+        """Shift the denormalized unread-message counters in a single UPDATE."""
+        return self.update(unread_message_count=F("unread_message_count") + delta)
+
+    def recount_unread_messages(self):
+        """
+        Rebuild the unread-message counters from the messages table. Only the
+        rows that drifted are written; returns how many were corrected.
+        """
+        Message = self.model._meta.get_field("messages").related_model
+        counts = Coalesce(
+            Subquery(
+                Message.objects.filter(recipient=OuterRef("pk"), is_read=False)
+                .order_by()
+                .values("recipient")
+                .annotate(c=Count("pk"))
+                .values("c")
+            ),
+            0,
+        )
+        return (
+            self.annotate(actual_unread=counts)
+            .exclude(unread_message_count=F("actual_unread"))
+            .update(unread_message_count=counts)
+        )
+
+    def export_rows(self):
+        """
+        Flat dicts for catalog exports, unordered. Skill names come from a
+        correlated subquery, so an export streams as a single query.
+        """
+        Skill = self.model._meta.get_field("skills").related_model
+        return self.order_by().values(
+            "id",
+            "short_intro",
+            "bio",
+            "location",
+            "social_github",
+            "social_stackoverflow",
+            "social_twitter",
+            "social_linkedin",
+            "social_website",
+            "created",
+            "updated",
+            username=F("user__username"),
+            first_name=F("user__first_name"),
+            last_name=F("user__last_name"),
+            skill_names=ArraySubquery(
+                Skill.objects.filter(profiles=OuterRef("pk"))
+                .order_by("name")
+                .values("name")
+            ),
+        )
+
+    def location_facets(self, limit=None):
+        """
+        Number of profiles per canonical location within this queryset, most
+        common first, as `{"name", "count"}` dicts.
+
+        A filtered queryset is grouped by its location key in one query; the
+        unfiltered list reads the maintained `Location.profile_count`.
+        """
+        Location = self.model._meta.get_field("canonical_location").related_model
+        if not self.query.where:
+            rows = (
+                Location.objects.filter(profile_count__gt=0)
+                .order_by("-profile_count", "city", "country")
+                .values_list("city", "country", "profile_count")
+            )
+        else:
+            rows = (
+                self.filter(canonical_location__isnull=False)
+                .order_by()
+                .values_list(
+                    "canonical_location__city", "canonical_location__country"
+                )
+                .annotate(count=Count("pk"))
+                .order_by(
+                    "-count", "canonical_location__city", "canonical_location__country"
+                )
+            )
+        return [
+            {"name": Location.format_name(city, country), "count": count}
+            for city, country, count in rows[:limit]
+        ]
+
+    def refresh_skills(self):
+        """
+        Rebuild the search document after the profiles' skills changed, touch
+        `updated` since skills are part of the representation, and queue the
+        profiles for a similar-profiles rebuild.
+        """
+        return self.update(
+            search_vector=self.build_search_vector(),
+            updated=Now(),
+            similar_profiles_stale=True,
+        )
+
+
+class SimilarProfileQuerySet(models.QuerySet):
+    """
+    Precomputed "similar developers" links, scored by the cosine similarity
+    of the two profiles' IDF-weighted skill vectors and capped at
+    `stored_per_profile` per profile.
+    """
+
+    stored_per_profile = 10
+
+    def load_vectors(self, profile_ids=None):
+        """
+        Skill vectors of every profile, or only of the given profiles and the
+        candidates sharing a skill with them, weighted by the maintained
+        `Skill.profile_count`.
+        """
+        Profile = self.model._meta.get_field("profile").related_model
+        ProfileSkill = Profile.skills.through
+        links = ProfileSkill.objects.order_by()
+        if profile_ids is None:
+            return SkillVectors(list(links.values_list("profile_id", "skill_id")))
+
+        shared_skills = links.filter(profile_id__in=profile_ids).values("skill_id")
+        candidates = links.filter(skill_id__in=shared_skills).values("profile_id")
+        pairs = list(
+            links.filter(profile_id__in=candidates).values_list(
+                "profile_id", "skill_id"
+            )
+        )
+        Skill = ProfileSkill._meta.get_field("skill").related_model
+        document_frequency = dict(
+            Skill.objects.filter(
+                pk__in={skill_id for _, skill_id in pairs}
+            ).values_list("pk", "profile_count")
+        )
+        profile_count = links.values("profile_id").distinct().count()
+        return SkillVectors(pairs, profile_count, document_frequency)
+
+    def rebuild(self, batch_size=256):
+        """Recompute every profile's neighbours from scratch."""
+        Profile = self.model._meta.get_field("profile").related_model
+        Profile.objects.filter(similar_profiles_stale=True).update(
+            similar_profiles_stale=False
+        )
+        vectors = self.load_vectors()
+
+        with transaction.atomic():
+            self.model.objects.all().delete()
+            for start in range(0, len(vectors), batch_size):
+                rows = range(start, min(start + batch_size, len(vectors)))
+                neighbours = vectors.top_k(rows, self.stored_per_profile)
+                self.bulk_create(
+                    self.model(profile_id=profile_id, similar_id=other, score=score)
+                    for profile_id, found in neighbours.items()
+                    for other, score in found
+                )
+        return len(vectors)
+
+    def refresh_stale(self, batch_size=256):
+        """
+        Incremental rebuild for the profiles whose skills changed since the
+        last run, matching a full rebuild up to IDF drift.
+
+        Each stale profile's list is rebuilt, and so is every list it
+        appeared in: its old score there is stale, and dropping it may let
+        another profile back in. So is every list it may now enter: those of
+        the profiles sharing a skill with it that are short of the cap or
+        whose lowest score doesn't beat their new score with it. Only the
+        profiles sharing a skill with those lists are loaded, and the IDF
+        weights of untouched lists drift until the next full rebuild. Flags
+        are cleared before the vectors are read, so skills changed meanwhile
+        are picked up next run.
+        """
+        Profile = self.model._meta.get_field("profile").related_model
+        stale = Profile.objects.filter(similar_profiles_stale=True)
+        profile_ids = list(stale.values_list("pk", flat=True))
+        if not profile_ids:
+            return 0
+        Profile.objects.filter(pk__in=profile_ids).update(similar_profiles_stale=False)
+
+        for start in range(0, len(profile_ids), batch_size):
+            batch = profile_ids[start : start + batch_size]
+            with transaction.atomic():
+                referrers = set(
+                    self.filter(similar_id__in=batch).values_list(
+                        "profile_id", flat=True
+                    )
+                )
+                entered = self.entered_lists(batch, exclude=referrers)
+                targets = set(batch) | referrers | entered
+                vectors = self.load_vectors(targets)
+                neighbours = vectors.top_k(
+                    [
+                        vectors.profile_index[profile_id]
+                        for profile_id in targets
+                        if profile_id in vectors.profile_index
+                    ],
+                    self.stored_per_profile,
+                )
+
+                self.filter(profile_id__in=targets).delete()
+                self.bulk_create(
+                    self.model(profile_id=profile_id, similar_id=other, score=score)
+                    for profile_id, found in neighbours.items()
+                    for other, score in found
+                )
+        return len(profile_ids)
+
+    def entered_lists(self, batch, exclude):
+        """
+        Profiles outside `exclude` whose lists the batch's profiles may now
+        enter: sharing a skill with one of them, and short of the cap or with
+        a lowest stored score that doesn't beat their score with it.
+        """
+        vectors = self.load_vectors(batch)
+        rows = [
+            vectors.profile_index[profile_id]
+            for profile_id in batch
+            if profile_id in vectors.profile_index
+        ]
+        exclude = set(exclude) | set(batch)
+        scores = {}
+        for found in vectors.top_k(rows, len(vectors)).values():
+            for other, score in found:
+                if other not in exclude:
+                    scores[other] = max(scores.get(other, 0), score)
+
+        stored = dict.fromkeys(scores, (0, None))
+        stored.update(
+            (row["profile_id"], (row["stored"], row["lowest"]))
+            for row in self.filter(profile_id__in=scores)
+            .order_by()
+            .values("profile_id")
+            .annotate(stored=Count("pk"), lowest=Min("score"))
+        )
+        # Scores are float32 sums, so a tie may come back a rounding apart
+        return {
+            other
+            for other, (count, lowest) in stored.items()
+            if count < self.stored_per_profile or lowest <= scores[other] + 1e-6
+        }
@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-17 17:17
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_profile_skills_alter_profileskill_profile_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['location'], name='profile_location_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='skill_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
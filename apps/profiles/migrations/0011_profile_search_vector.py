@@ -0,0 +1,57 @@
+# Generated by Django 5.1 on 2026-10-17 17:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+SEARCH_CONFIG = "english"
+
+
+def populate_search_vector(apps, schema_editor):
+    Profile = apps.get_model("profiles", "Profile")
+    Skill = apps.get_model("profiles", "Skill")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    full_name = Subquery(
+        User._base_manager.filter(pk=OuterRef("user_id"))
+        .annotate(full_name=Concat("first_name", Value(" "), "last_name"))
+        .values("full_name")[:1]
+    )
+    skill_names = Subquery(
+        Skill.objects.filter(profiles=OuterRef("pk"))
+        .values("profiles")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")[:1]
+    )
+    Profile.objects.update(
+        search_vector=SearchVector(full_name, weight="A", config=SEARCH_CONFIG)
+        + SearchVector(skill_names, weight="B", config=SEARCH_CONFIG)
+        + SearchVector("short_intro", weight="C", config=SEARCH_CONFIG)
+        + SearchVector("bio", "location", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='profiles_pr_search__4d8435_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
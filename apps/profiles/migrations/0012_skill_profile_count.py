@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 17:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_profiles(apps, schema_editor):
+    Skill = apps.get_model("profiles", "Skill")
+    ProfileSkill = apps.get_model("profiles", "ProfileSkill")
+    counts = (
+        ProfileSkill.objects.filter(skill=OuterRef("pk"))
+        .order_by()
+        .values("skill")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    Skill.objects.update(profile_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0011_profile_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='profile_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount_profiles, migrations.RunPython.noop),
+    ]
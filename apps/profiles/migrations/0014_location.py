@@ -0,0 +1,189 @@
+# Generated by Django 5.1 on 2026-10-17 17:58
+
+import django.db.models.deletion
+import re
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# A frozen copy of apps.profiles.locations, so later edits to the live
+# parser don't change what this migration does.
+COUNTRIES = [
+    "Algeria",
+    "Argentina",
+    "Australia",
+    "Austria",
+    "Bangladesh",
+    "Belgium",
+    "Benin",
+    "Botswana",
+    "Brazil",
+    "Cameroon",
+    "Canada",
+    "Chile",
+    "China",
+    "Colombia",
+    "Denmark",
+    "Egypt",
+    "Ethiopia",
+    "Finland",
+    "France",
+    "Germany",
+    "Ghana",
+    "India",
+    "Indonesia",
+    "Ireland",
+    "Israel",
+    "Italy",
+    "Ivory Coast",
+    "Japan",
+    "Kenya",
+    "Malawi",
+    "Malaysia",
+    "Mexico",
+    "Morocco",
+    "Mozambique",
+    "Namibia",
+    "Netherlands",
+    "New Zealand",
+    "Niger",
+    "Nigeria",
+    "Norway",
+    "Pakistan",
+    "Philippines",
+    "Poland",
+    "Portugal",
+    "Rwanda",
+    "Senegal",
+    "Singapore",
+    "South Africa",
+    "South Korea",
+    "Spain",
+    "Sweden",
+    "Switzerland",
+    "Tanzania",
+    "Togo",
+    "Tunisia",
+    "Turkey",
+    "Uganda",
+    "Ukraine",
+    "United Arab Emirates",
+    "United Kingdom",
+    "United States",
+    "Vietnam",
+    "Zambia",
+    "Zimbabwe",
+]
+
+# Lowercase spellings and codes people use -> canonical country name. Two
+# letter codes that read as US states or provinces (e.g. "ca") are left out.
+COUNTRY_ALIASES = {
+    **{country.lower(): country for country in COUNTRIES},
+    "cote d ivoire": "Ivory Coast",
+    "england": "United Kingdom",
+    "gb": "United Kingdom",
+    "great britain": "United Kingdom",
+    "holland": "Netherlands",
+    "ke": "Kenya",
+    "ng": "Nigeria",
+    "nig": "Nigeria",
+    "rsa": "South Africa",
+    "scotland": "United Kingdom",
+    "the netherlands": "Netherlands",
+    "uae": "United Arab Emirates",
+    "uk": "United Kingdom",
+    "united states of america": "United States",
+    "us": "United States",
+    "usa": "United States",
+    "wales": "United Kingdom",
+    "za": "South Africa",
+}
+LONGEST_ALIAS = max(len(alias.split()) for alias in COUNTRY_ALIASES)
+
+
+def parse_location(text):
+    text = re.sub(r"[^\w\s,]+", " ", (text or "").lower()).replace("_", " ")
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return "", ""
+
+    if len(parts) > 1:
+        country = parts[-1]
+        return parts[0].title(), COUNTRY_ALIASES.get(country, country.title())
+
+    words = parts[0].split()
+    for size in range(min(LONGEST_ALIAS, len(words)), 0, -1):
+        country = COUNTRY_ALIASES.get(" ".join(words[-size:]))
+        if country:
+            return " ".join(words[:-size]).title(), country
+    return parts[0].title(), ""
+
+
+def link_locations(apps, schema_editor):
+    Location = apps.get_model("profiles", "Location")
+    Profile = apps.get_model("profiles", "Profile")
+
+    def resolve(city, country):
+        if not country:
+            matches = list(Location.objects.filter(city=city).exclude(country="")[:2])
+            if len(matches) == 1:
+                return matches[0]
+        location, _ = Location.objects.get_or_create(city=city, country=country)
+        return location
+
+    texts = Profile.objects.exclude(location="").values_list("location", flat=True)
+    places = {text: parse_location(text) for text in texts.distinct().order_by()}
+    # Texts naming a country first, so bare cities can join those places
+    for text in sorted(places, key=lambda text: not places[text][1]):
+        city, country = places[text]
+        if city or country:
+            location = resolve(city, country)
+            Profile.objects.filter(location=text).update(canonical_location=location)
+
+    counts = (
+        Profile.objects.filter(canonical_location=OuterRef("pk"))
+        .order_by()
+        .values("canonical_location")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    Location.objects.update(profile_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0013_profile_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('profile_count', models.IntegerField(default=0, editable=False)),
+            ],
+            options={
+                'ordering': ['city', 'country'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='profile',
+            name='profile_location_trgm',
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(fields=('city', 'country'), name='unique_location_city_country'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='canonical_location',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profiles', to='profiles.location'),
+        ),
+        migrations.RunPython(link_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1 on 2026-10-17 18:02
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0014_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProfile',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='similar_profiles_stale',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('similar_profiles_stale', True)), fields=['similar_profiles_stale'], name='profile_similar_stale'),
+        ),
+        migrations.AddField(
+            model_name='similarprofile',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='profiles.profile'),
+        ),
+        migrations.AddField(
+            model_name='similarprofile',
+            name='similar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.profile'),
+        ),
+        migrations.AddIndex(
+            model_name='similarprofile',
+            index=models.Index(fields=['profile', '-score'], name='profiles_si_profile_1b44ca_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='similarprofile',
+            unique_together={('profile', 'similar')},
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-17 18:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_unread_messages(apps, schema_editor):
+    Profile = apps.get_model("profiles", "Profile")
+    Message = apps.get_model("messaging", "Message")
+    unread = (
+        Message.objects.filter(recipient=OuterRef("pk"), is_read=False)
+        .order_by()
+        .values("recipient")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    Profile.objects.update(unread_message_count=Coalesce(Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_alter_message_name'),
+        ('profiles', '0015_similarprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_message_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount_unread_messages, migrations.RunPython.noop),
+    ]
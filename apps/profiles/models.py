@@ -1,16 +1,33 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from apps.common.models import BaseModel
 
+from .managers import (
+    LocationQuerySet,
+    ProfileQuerySet,
+    SimilarProfileQuerySet,
+    SkillQuerySet,
+)
+
 AVATAR_FOLDER = "avatar/"
 
 
 class Skill(BaseModel):
     name = models.CharField(max_length=100, unique=True)
+    profile_count = models.IntegerField(default=0, editable=False)
+
+    objects = SkillQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            GinIndex(
+                fields=["name"], name="skill_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ]
 
     def clean(self):
         if self.name:
@@ -20,6 +37,35 @@ class Skill(BaseModel):
         return self.name
 
 
+class Location(BaseModel):
+    """A canonical city/country pair that free-text profile locations map to."""
+
+    city = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=100, blank=True, db_index=True)
+    profile_count = models.IntegerField(default=0, editable=False)
+
+    objects = LocationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["city", "country"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "country"], name="unique_location_city_country"
+            ),
+        ]
+
+    @staticmethod
+    def format_name(city, country):
+        return ", ".join(part for part in (city, country) if part)
+
+    @property
+    def name(self):
+        return self.format_name(self.city, self.country)
+
+    def __str__(self):
+        return self.name
+
+
 class ProfileSkill(BaseModel):
     profile = models.ForeignKey(
         "Profile", on_delete=models.CASCADE
@@ -41,8 +87,22 @@ class Profile(BaseModel):
     short_intro = models.CharField(max_length=200, blank=True)
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=100, blank=True)
+    canonical_location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="profiles",
+    )
     avatar = models.ImageField(upload_to=AVATAR_FOLDER, null=True, blank=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     updated = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set when the skills change; cleared once the similar profiles are rebuilt
+    similar_profiles_stale = models.BooleanField(default=True, editable=False)
+    # Maintained from the messages table; see apps.messaging.signals
+    unread_message_count = models.PositiveIntegerField(default=0, editable=False)
 
     # Social Links
     social_github = models.URLField(max_length=200, blank=True)
@@ -58,15 +118,30 @@ class Profile(BaseModel):
         related_name="profiles",
     )
 
+    objects = ProfileQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created"]
         indexes = [
             models.Index(fields=["-created"]),
+            GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["similar_profiles_stale"],
+                name="profile_similar_stale",
+                condition=models.Q(similar_profiles_stale=True),
+            ),
         ]
 
     def __str__(self):
         return f"{self.user.full_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored text so only edits re-resolve the location
+        instance._loaded_location = dict(zip(field_names, values)).get("location")
+        return instance
+
     @property
     def avatar_url(self):
         try:
@@ -74,3 +149,23 @@ class Profile(BaseModel):
         except:
             url = "https://res.cloudinary.com/dq0ow9lxw/image/upload/v1732236186/default-image_foxagq.jpg"
         return url
+
+
+class SimilarProfile(BaseModel):
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="similar_links"
+    )
+    similar = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    objects = SimilarProfileQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-score"]
+        unique_together = ("profile", "similar")
+        indexes = [
+            models.Index(fields=["profile", "-score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.profile} -> {self.similar} ({self.score:.2f})"
@@ -13,6 +13,8 @@ from apps.common.serializers import ErrorDataResponseSerializer, ErrorResponseSe
 from apps.profiles.serializers import (
     ProfileSerializer,
     ProfileSkillSerializer,
+    SimilarProfileSerializer,
+    SkillAutocompleteSerializer,
     SkillSerializer,
 )
 
@@ -226,6 +228,74 @@ SKILL_LIST_RESPONSE_EXAMPLE = {
     401: UNAUTHORIZED_USER_RESPONSE,
 }
 
+SIMILAR_PROFILES_RESPONSE_EXAMPLE = {
+    200: OpenApiResponse(
+        description="Similar Profiles Fetched",
+        response=SimilarProfileSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Similar profiles retrieved successfully.",
+                    "data": [
+                        {
+                            "username": "jane-doe",
+                            "name": "Jane Doe",
+                            "short_intro": "Backend developer",
+                            "location": "Lagos, Nigeria",
+                            "avatar_url": AVATAR_URL,
+                            "score": 0.82,
+                        },
+                    ],
+                },
+            ),
+        ],
+    ),
+    404: OpenApiResponse(
+        response=ErrorResponseSerializer,
+        description="Profile Not Found",
+        examples=[
+            OpenApiExample(
+                name="Profile Not Found",
+                value={
+                    "status": ERR_RESPONSE_STATUS,
+                    "message": "Profile not found.",
+                    "code": ErrorCode.NON_EXISTENT,
+                },
+            ),
+        ],
+    ),
+}
+
+SKILL_AUTOCOMPLETE_RESPONSE_EXAMPLE = {
+    200: OpenApiResponse(
+        description="Skill Suggestions Fetched",
+        response=SkillAutocompleteSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Skill suggestions retrieved successfully.",
+                    "data": [
+                        {
+                            "id": "0d249872-b8ac-4871-a4af-edfbf5884bc2",
+                            "name": "django",
+                            "profile_count": 42,
+                        },
+                        {
+                            "id": "b8dab62e-3fc4-4f0d-bd92-ce5279396b7a",
+                            "name": "django-rest-framework",
+                            "profile_count": 17,
+                        },
+                    ],
+                },
+            ),
+        ],
+    ),
+}
+
 SKILL_CREATE_RESPONSE_EXAMPLE = {
     201: OpenApiResponse(
         description="Skill Create Successful",
@@ -287,6 +357,28 @@ SKILL_CREATE_ALTERNATIVE_RESPONSE_EXAMPLE = {
 }
 
 
+SKILL_BULK_REPLACE_RESPONSE_EXAMPLE = {
+    200: OpenApiResponse(
+        description="Skills Replaced",
+        response=ProfileSkillSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Skills updated successfully.",
+                    "data": [SKILL_EXAMPLE_2],
+                },
+            ),
+        ],
+    ),
+    401: UNAUTHORIZED_USER_RESPONSE,
+    422: OpenApiResponse(
+        response=ErrorDataResponseSerializer,
+        description="Validation Error",
+    ),
+}
+
 SKILL_UPDATE_RESPONSE_EXAMPLE = {
     200: OpenApiResponse(
         description="Skill Update Successfull",
@@ -1,8 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from .models import Profile, ProfileSkill, Skill
+from apps.common.cache import invalidate_cache_tags
+from apps.common.images import ImageUploadMixin, prepare_upload, variant_urls
+from apps.common.serializers import SparseFieldsetMixin
+
+from .cache import invalidate_profiles
+from .models import Profile, ProfileSkill, SimilarProfile, Skill
 
 User = get_user_model()
 
@@ -13,6 +20,12 @@ class SkillSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+class SkillAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Skill
+        fields = ["id", "name", "profile_count"]
+
+
 class ProfileSkillSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(source="skill.id", read_only=True)
     name = serializers.CharField(source="skill.name", read_only=True)
@@ -47,6 +60,83 @@ class ProfileSkillCreateSerializer(serializers.ModelSerializer):
         return profile_skill
 
 
+class ProfileSkillItemSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(allow_blank=True, required=False, default="")
+
+    def validate_name(self, value):
+        return value.strip().lower()
+
+
+class ProfileSkillBulkSerializer(serializers.Serializer):
+    skills = ProfileSkillItemSerializer(many=True, max_length=100)
+
+    def validate_skills(self, value):
+        # Skills are stored lowercase; a repeated name keeps its last entry
+        return list({item["name"]: item for item in value}.values())
+
+    def update(self, profile, validated_data):
+        """
+        Make the profile's skills exactly the submitted list.
+
+        The profile row is locked and its skills read inside the transaction,
+        so concurrent replaces of the same profile run one after the other.
+        Missing skills are created with one insert, new links are bulk
+        inserted, changed descriptions bulk updated and removed links deleted
+        with one statement. Bulk inserts and updates send no signals, so the
+        counters of the skills actually linked, the search document and the
+        caches are refreshed here once; deletes go through the signals.
+        """
+        items = validated_data["skills"]
+        wanted = {item["name"]: item["description"] for item in items}
+
+        with transaction.atomic():
+            Profile.objects.select_for_update().get(pk=profile.pk)
+            current = {
+                profile_skill.skill.name: profile_skill
+                for profile_skill in profile.profileskill_set.select_related("skill")
+            }
+            new_names = [name for name in wanted if name not in current]
+            removed_names = [name for name in current if name not in wanted]
+
+            changed = []
+            for name, profile_skill in current.items():
+                if name in wanted and profile_skill.description != wanted[name]:
+                    profile_skill.description = wanted[name]
+                    changed.append(profile_skill)
+
+            skill_ids = Skill.objects.ensure(new_names)
+            links = ProfileSkill.objects.bulk_create(
+                [
+                    ProfileSkill(
+                        profile=profile,
+                        skill_id=skill_ids[name],
+                        description=wanted[name],
+                    )
+                    for name in new_names
+                ],
+                ignore_conflicts=True,
+            )
+            # Links that conflicted with an existing row were not written
+            added_ids = ProfileSkill.objects.filter(
+                pk__in=[link.pk for link in links]
+            ).values("skill_id")
+            ProfileSkill.objects.bulk_update(changed, ["description"])
+
+            if removed_names:
+                ProfileSkill.objects.filter(
+                    pk__in=[current[name].pk for name in removed_names]
+                ).delete()
+
+            if new_names or changed:
+                Skill.objects.filter(pk__in=added_ids).apply_profile_delta(1)
+                Profile.objects.filter(pk=profile.pk).refresh_skills()
+                invalidate_profiles(profile.user.username)
+                invalidate_cache_tags("profiles")
+
+        return profile
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -83,12 +173,13 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     skills = ProfileSkillSerializer(
         source="profileskill_set", many=True, read_only=True
     )
     avatar_url = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Profile
@@ -103,17 +194,52 @@ class ProfileSerializer(serializers.ModelSerializer):
             "social_linkedin",
             "skills",
             "avatar_url",
+            "avatar_variants",
         ]
+        field_lookups = {
+            "skills": [
+                Prefetch(
+                    "profileskill_set",
+                    queryset=ProfileSkill.objects.select_related("skill").order_by(
+                        "skill__name"
+                    ),
+                )
+            ],
+            "avatar_url": ["avatar"],
+            "avatar_variants": ["avatar", "avatar_variants"],
+        }
+        deferred_columns = ["search_vector"]
 
     @extend_schema_field(serializers.URLField)
     def get_avatar_url(self, obj):
         return obj.avatar_url
 
+    @extend_schema_field(serializers.DictField(child=serializers.URLField()))
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj, "avatar")
+
+
+class SimilarProfileSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="similar.user.username")
+    name = serializers.CharField(source="similar.user.full_name")
+    short_intro = serializers.CharField(source="similar.short_intro")
+    location = serializers.CharField(source="similar.location")
+    avatar_url = serializers.URLField(source="similar.avatar_url")
+
+    class Meta:
+        model = SimilarProfile
+        fields = ["username", "name", "short_intro", "location", "avatar_url", "score"]
+        read_only_fields = fields
 
-class AvatarSerializer(serializers.ModelSerializer):
+
+class AvatarSerializer(ImageUploadMixin, serializers.ModelSerializer):
+    image_field = "avatar"
 
     class Meta:
         model = Profile
         fields = [
             "avatar",
         ]
+
+    def validate_avatar(self, value):
+        return prepare_upload(value) if value else value
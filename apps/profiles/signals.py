@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.common.cache import invalidate_cache_tags
+from apps.profiles.cache import invalidate_profiles
+from apps.profiles.models import Location, Profile, ProfileSkill, Skill
+
+PROFILE_SEARCH_FIELDS = {"short_intro", "bio", "location"}
+USER_SEARCH_FIELDS = {"first_name", "last_name"}
+
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_search_vector(sender, instance, update_fields=None, **kwargs):
+    # Skip saves that can't change the search document (e.g. avatar uploads)
+    if update_fields is not None and not PROFILE_SEARCH_FIELDS & set(update_fields):
+        return
+    Profile.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Profile)
+def update_canonical_location(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    # Only an edit to the free text can move the profile to another place
+    if update_fields is not None and "location" not in update_fields:
+        return
+    if "location" in instance.get_deferred_fields():
+        return
+    previous_text = getattr(instance, "_loaded_location", None)
+    if not created and instance.location == previous_text:
+        return
+
+    instance._loaded_location = instance.location
+    location = Location.objects.resolve(instance.location)
+    # Read back, since resolving may have moved the profile to a merged place
+    previous_id = (
+        Profile.objects.filter(pk=instance.pk)
+        .values_list("canonical_location_id", flat=True)
+        .first()
+    )
+    if getattr(location, "pk", None) == previous_id:
+        instance.canonical_location = location
+        return
+
+    Profile.objects.filter(pk=instance.pk).update(canonical_location=location)
+    instance.canonical_location = location
+    if location is not None:
+        Location.objects.filter(pk=location.pk).apply_profile_delta(1)
+    if previous_id is not None:
+        Location.objects.filter(pk=previous_id).apply_profile_delta(-1)
+
+
+@receiver(post_delete, sender=Profile)
+def update_location_counter_on_profile_delete(sender, instance, **kwargs):
+    if instance.canonical_location_id is not None:
+        locations = Location.objects.filter(pk=instance.canonical_location_id)
+        locations.apply_profile_delta(-1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_search_vector_on_user_change(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    # A new user's profile builds its own document when it is created
+    if created:
+        return
+    if update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields):
+        return
+    Profile.objects.filter(user=instance).update_search_vector()
+
+
+@receiver([post_save, post_delete], sender=ProfileSkill)
+def refresh_profile_on_skill_change(sender, instance, **kwargs):
+    Profile.objects.filter(pk=instance.profile_id).refresh_skills()
+
+
+@receiver(post_save, sender=ProfileSkill)
+def update_skill_counter_on_add(sender, instance, created, **kwargs):
+    if created:
+        Skill.objects.filter(pk=instance.skill_id).apply_profile_delta(1)
+
+
+@receiver(post_delete, sender=ProfileSkill)
+def update_skill_counter_on_remove(sender, instance, **kwargs):
+    Skill.objects.filter(pk=instance.skill_id).apply_profile_delta(-1)
+
+
+@receiver(post_save, sender=Skill)
+def refresh_profiles_on_skill_rename(sender, instance, created, **kwargs):
+    if not created:
+        Profile.objects.filter(skills=instance).refresh_skills()
+
+
+@receiver(pre_delete, sender=Skill)
+def touch_profiles_on_skill_delete(sender, instance, **kwargs):
+    Profile.objects.filter(skills=instance).update(updated=Now())
+
+
+@receiver([post_save, post_delete], sender=Profile)
+@receiver([post_save, post_delete], sender=ProfileSkill)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_profile_responses(sender, **kwargs):
+    invalidate_cache_tags("profiles")
+
+
+def usernames_for(**lookups):
+    User = get_user_model()
+    return User._base_manager.filter(**lookups).values_list("username", flat=True)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_profiles(instance.user.username)
+
+
+@receiver([post_save, post_delete], sender=ProfileSkill)
+def invalidate_cached_profile_on_skill_change(sender, instance, **kwargs):
+    invalidate_profiles(*usernames_for(profile__id=instance.profile_id))
+
+
+@receiver([post_save, pre_delete], sender=Skill)
+def invalidate_cached_profiles_on_skill_change(sender, instance, **kwargs):
+    if kwargs.get("created"):
+        return
+    invalidate_profiles(*usernames_for(profile__skills=instance))
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_username(sender, instance, **kwargs):
+    # username is re-slugified on save, so keep the one the cache is keyed by
+    instance._cached_username = instance.username
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_profile_on_user_change(
+    sender, instance, update_fields=None, **kwargs
+):
+    # Logins only touch last_login, which the profile doesn't show
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_profiles(
+        getattr(instance, "_cached_username", None), instance.username
+    )
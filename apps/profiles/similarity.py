@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class SkillVectors:
+    """
+    IDF-weighted skill vectors of every profile that lists a skill, built
+    from (profile_id, skill_id) pairs and kept sparse: one weight per
+    ProfileSkill row, indexed both by profile and by skill.
+
+    Vectors are L2-normalized, so the dot product of two is their cosine
+    similarity. A skill's weight is its smoothed inverse document frequency,
+    `ln((1 + N) / (1 + df)) + 1`, so rare skills say more than common ones.
+
+    N and df are counted from the pairs unless given: a subset of profiles
+    (with all of their skills) can then be weighted as in the full corpus.
+    """
+
+    def __init__(self, pairs, profile_count=None, document_frequency=None):
+        profile_index, skill_index = {}, {}
+        rows = np.fromiter(
+            (profile_index.setdefault(p, len(profile_index)) for p, _ in pairs),
+            dtype=np.int64,
+            count=len(pairs),
+        )
+        cols = np.fromiter(
+            (skill_index.setdefault(s, len(skill_index)) for _, s in pairs),
+            dtype=np.int64,
+            count=len(pairs),
+        )
+        self.profile_ids = list(profile_index)
+        self.profile_index = profile_index
+
+        n_profiles, n_skills = len(profile_index), len(skill_index)
+        if document_frequency is None:
+            document_frequency = np.bincount(cols, minlength=n_skills)
+        else:
+            document_frequency = np.array(
+                [document_frequency.get(skill, 0) for skill in skill_index],
+                dtype=np.float64,
+            )
+        if profile_count is None:
+            profile_count = n_profiles
+        idf = np.log((1 + profile_count) / (1 + document_frequency)) + 1
+        weights = idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=n_profiles))
+        weights = (weights / norms[rows]).astype(np.float32)
+
+        by_row = np.argsort(rows, kind="stable")
+        self.row_cols = cols[by_row]
+        self.row_weights = weights[by_row]
+        self.row_starts = np.searchsorted(rows[by_row], np.arange(n_profiles + 1))
+
+        by_col = np.argsort(cols, kind="stable")
+        self.col_rows = rows[by_col]
+        self.col_weights = weights[by_col]
+        self.col_starts = np.searchsorted(cols[by_col], np.arange(n_skills + 1))
+
+    def __len__(self):
+        return len(self.profile_ids)
+
+    @staticmethod
+    def _slices(starts, positions):
+        return np.concatenate(
+            [np.arange(starts[i], starts[i + 1]) for i in positions]
+            or [np.empty(0, dtype=np.int64)]
+        )
+
+    def top_k(self, rows, k):
+        """
+        The `k` most similar profiles to each of the given profile rows, as
+        `{profile_id: [(other_id, score), ...]}` with the best match first.
+
+        Only profiles sharing a skill with the batch are scored: the batch
+        and those candidates are densified over the batch's skills alone and
+        multiplied in one matrix product.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return {}
+
+        entries = self._slices(self.row_starts, rows)
+        entry_rows = np.repeat(
+            np.arange(len(rows)), self.row_starts[rows + 1] - self.row_starts[rows]
+        )
+        skills = np.unique(self.row_cols[entries])
+
+        postings = self._slices(self.col_starts, skills)
+        candidates, candidate_pos = np.unique(
+            self.col_rows[postings], return_inverse=True
+        )
+        posting_skills = np.repeat(
+            np.arange(len(skills)),
+            self.col_starts[skills + 1] - self.col_starts[skills],
+        )
+
+        batch = np.zeros((len(rows), len(skills)), dtype=np.float32)
+        batch[entry_rows, np.searchsorted(skills, self.row_cols[entries])] = (
+            self.row_weights[entries]
+        )
+        matrix = np.zeros((len(candidates), len(skills)), dtype=np.float32)
+        matrix[candidate_pos, posting_skills] = self.col_weights[postings]
+
+        scores = batch @ matrix.T
+        # Every profile in the batch is among its own candidates
+        scores[np.arange(len(rows)), np.searchsorted(candidates, rows)] = 0
+
+        k = min(k, len(candidates))
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else None
+        neighbours = {}
+        for i, row in enumerate(rows):
+            found = []
+            if best is not None:
+                picked = best[i][np.argsort(-scores[i, best[i]], kind="stable")]
+                found = [
+                    (self.profile_ids[candidates[j]], float(scores[i, j]))
+                    for j in picked
+                    if scores[i, j] > 0
+                ]
+            neighbours[self.profile_ids[row]] = found
+        return neighbours
@@ -1,7 +1,30 @@
+import csv
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
 from rest_framework.test import APITestCase
 
 from apps.common.utils import TestUtil
-from apps.profiles.models import Profile
+from apps.profiles.cache import cache_profile, get_cached_profile, invalidate_profiles
+from apps.profiles.managers import SimilarProfileQuerySet, SkillQuerySet
+from apps.profiles.models import (
+    Location,
+    Profile,
+    ProfileSkill,
+    SimilarProfile,
+    Skill,
+)
 
 
 class TestProfiles(APITestCase):
@@ -10,8 +33,15 @@ class TestProfiles(APITestCase):
     profile_url = "/api/v1/profiles/<str:username>/"
     skill_create_list_url = "/api/v1/profiles/skills/"
     skill_u_d_url = "/api/v1/profiles/skills/<uuid:id>/"
+    skill_autocomplete_url = "/api/v1/profiles/skills/autocomplete/"
+    skill_bulk_url = "/api/v1/profiles/skills/bulk/"
+    avatar_url = "/api/v1/profiles/image/"
+    similar_url = "/api/v1/profiles/<str:username>/similar/"
+    export_url = "/api/v1/profiles/actions/export/"
 
     def setUp(self):
+        cache.clear()
+
         # user
         self.user1 = TestUtil.verified_user()
         self.user2 = TestUtil.other_verified_user()
@@ -32,6 +62,68 @@ class TestProfiles(APITestCase):
         response = self.client.get(self.profile_url.replace("<str:username>", username))
         self.assertEqual(response.status_code, 200)
 
+        # A username matching a collection action is still reachable
+        get_user_model().objects.filter(pk=self.user2.pk).update(username="export")
+        response = self.client.get(self.profile_url.replace("<str:username>", "export"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["user"]["username"], "export")
+
+    def test_profile_conditional_get(self):
+        url = self.profile_url.replace("<str:username>", self.user1.username)
+
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        # The validator comes from the cached profile
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Adding a skill changes the representation, and so the validator
+        TestUtil.add_skill("django", "Backend work", self.profile1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]["skills"]), 1)
+
+    def test_profile_detail_cache(self):
+        url = self.profile_url.replace("<str:username>", self.user1.username)
+        self.client.get(url)
+
+        # Repeat views, authenticated or not, skip the database
+        self.client.force_authenticate(user=self.user2)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["data"]["user"]["username"], self.user1.username)
+
+        # Skill and profile writes invalidate the entry
+        TestUtil.add_skill("django", "Backend work", self.profile1)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["data"]["skills"]), 1)
+
+        self.profile1.bio = "New bio"
+        self.profile1.save()
+        self.assertEqual(self.client.get(url).data["data"]["bio"], "New bio")
+
+        # A rename re-slugs the username; the old URL stops resolving
+        old_username = self.user1.username
+        self.user1.last_name = "Renamed"
+        self.user1.save()
+        self.assertNotEqual(self.user1.username, old_username)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            self.profile_url.replace("<str:username>", self.user1.username)
+        )
+        self.assertEqual(response.data["data"]["user"]["last_name"], "Renamed")
+
+        # An entry built from rows read before an invalidation is never served
+        username = self.user1.username
+        _, generation = get_cached_profile(username)
+        invalidate_profiles(username)
+        cache_profile(username, generation, {"bio": "Stale"}, timezone.now())
+        self.assertIsNone(get_cached_profile(username)[0])
+
     def test_profile_patch(self):
         username = self.profile1.user.username
 
@@ -72,6 +164,276 @@ class TestProfiles(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data["data"]["results"]), 0)
 
+    def test_profile_list_filter(self):
+        TestUtil.add_skill("django", "Backend work", self.profile1)
+        TestUtil.add_skill("flask", "Microservices", self.profile2)
+        self.profile1.location = "Lagos, Nigeria"
+        self.profile1.save()
+        self.profile2.location = "Nairobi, Kenya"
+        self.profile2.save()
+
+        # Skill filter tolerates typos
+        response = self.client.get(self.profile_list_url, {"skills": "djang"})
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["user"]["username"], self.user1.username)
+
+        # Location matches the normalized place; a bare city in any country
+        response = self.client.get(self.profile_list_url, {"location": "lagos"})
+        results = response.data["data"]["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["location"], "Lagos, Nigeria")
+
+        response = self.client.get(self.profile_list_url, {"location": "london"})
+        self.assertEqual(len(response.data["data"]["results"]), 0)
+
+    def test_profile_location_facets(self):
+        self.profile1.location = "Lagos"
+        self.profile1.save()
+        self.profile2.location = "lagos ng"
+        self.profile2.save()
+
+        # Spellings of the same place share one canonical location, and a
+        # bare city is folded into the first place named with a country
+        self.profile1.refresh_from_db()
+        self.profile2.refresh_from_db()
+        self.assertEqual(
+            self.profile1.canonical_location_id, self.profile2.canonical_location_id
+        )
+        self.assertEqual(str(self.profile1.canonical_location), "Lagos, Nigeria")
+
+        response = self.client.get(self.profile_list_url, {"location": "Lagos NG"})
+        self.assertEqual(len(response.data["data"]["results"]), 2)
+        response = self.client.get(self.profile_list_url, {"location": "nigeria"})
+        self.assertEqual(len(response.data["data"]["results"]), 2)
+
+        # Counters follow moves and deletes
+        self.profile2.location = "Nairobi, Kenya"
+        self.profile2.save()
+        self.assertEqual(
+            dict(Location.objects.values_list("city", "profile_count")),
+            {"Lagos": 1, "Nairobi": 1},
+        )
+
+        # Unfiltered: served from the counters
+        response = self.client.get(self.profile_list_url, {"facets": "location"})
+        self.assertEqual(
+            response.data["data"]["facets"]["location"],
+            [
+                {"name": "Lagos, Nigeria", "count": 1},
+                {"name": "Nairobi, Kenya", "count": 1},
+            ],
+        )
+
+        # Filtered: grouped over the matching profiles
+        response = self.client.get(
+            self.profile_list_url, {"facets": "location", "location": "kenya"}
+        )
+        self.assertEqual(
+            response.data["data"]["facets"]["location"],
+            [{"name": "Nairobi, Kenya", "count": 1}],
+        )
+
+        self.profile1.delete()
+        self.assertEqual(Location.objects.get(city="Lagos").profile_count, 0)
+
+        # A profile moving from a bare city to its country is counted once
+        self.profile2.location = "Accra"
+        self.profile2.save()
+        self.profile2.location = "Accra, Ghana"
+        self.profile2.save()
+        self.assertEqual(
+            list(Location.objects.filter(city="Accra").values_list(
+                "country", "profile_count"
+            )),
+            [("Ghana", 1)],
+        )
+
+    def test_profile_list_search(self):
+        # Name matches outrank a mention in the bio
+        self.profile1.bio = "Pairs often with Otherisgood on backend work"
+        self.profile1.save()
+        response = self.client.get(self.profile_list_url, {"search": "otherisgood"})
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]["results"]
+        self.assertEqual(
+            [result["user"]["username"] for result in results],
+            [self.user2.username, self.user1.username],
+        )
+
+        # Skill and user changes refresh the document
+        TestUtil.add_skill("kubernetes", "Cluster ops", self.profile2)
+        response = self.client.get(self.profile_list_url, {"search": "kubernetes"})
+        results = response.data["data"]["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["user"]["username"], self.user2.username)
+
+        self.user1.first_name = "Adaeze"
+        self.user1.save()
+        response = self.client.get(self.profile_list_url, {"search": "adaeze"})
+        results = response.data["data"]["results"]
+        self.assertEqual(len(results), 1)
+
+    def test_profile_sparse_fields(self):
+        TestUtil.add_skill("django", "APIs", self.profile1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.profile_list_url, {"fields": "short_intro,location"}
+            )
+        self.assertEqual(response.status_code, 200)
+        for profile in response.data["data"]["results"]:
+            self.assertEqual(list(profile), ["short_intro", "location"])
+
+        # No user join, no skills prefetch, no long text columns
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn('"profiles_profile"."bio"', sql)
+        self.assertNotIn('"profiles_profileskill"', sql)
+        self.assertNotIn('"accounts_user"', sql)
+
+        # The detail is cut from the cached full representation
+        url = self.profile_url.replace("<str:username>", self.user1.username)
+        response = self.client.get(url, {"exclude": "skills,bio"})
+        self.assertNotIn("skills", response.data["data"])
+        self.assertIn("user", response.data["data"])
+
+        response = self.client.get(url, {"fields": "skills"})
+        self.assertEqual(response.data["data"]["skills"][0]["name"], "django")
+
+        response = self.client.get(url, {"fields": "password"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_similar_profiles(self):
+        user3 = get_user_model().objects.create_user(
+            first_name="Third",
+            last_name="Dev",
+            email="thirddev@example.com",
+            password="Thirddev123@",
+        )
+        profile3 = Profile.objects.get(user=user3)
+        skills = {
+            name: TestUtil.create_skill(name) for name in ("django", "sql", "css")
+        }
+        for profile, names in (
+            (self.profile1, ["django", "sql", "css"]),
+            (self.profile2, ["django", "sql"]),
+            (profile3, ["css"]),
+        ):
+            for name in names:
+                ProfileSkill.objects.create(profile=profile, skill=skills[name])
+
+        call_command("rebuild_similar_profiles", stdout=StringIO())
+        url = self.similar_url.replace("<str:username>", self.user1.username)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        results = response.data["data"]
+        self.assertEqual(
+            [result["username"] for result in results],
+            [self.user2.username, user3.username],
+        )
+        self.assertGreater(results[0]["score"], results[1]["score"])
+
+        # Scores are symmetric
+        link = SimilarProfile.objects.get(profile=self.profile2, similar=self.profile1)
+        self.assertAlmostEqual(link.score, results[0]["score"], places=5)
+
+        # Only profiles whose skills changed are rebuilt
+        ProfileSkill.objects.filter(profile=profile3).delete()
+        ProfileSkill.objects.create(profile=profile3, skill=skills["sql"])
+        out = StringIO()
+        call_command("rebuild_similar_profiles", stdout=out)
+        self.assertIn("for 1 profiles", out.getvalue())
+        response = self.client.get(
+            self.similar_url.replace("<str:username>", user3.username)
+        )
+        self.assertEqual(
+            {result["username"] for result in response.data["data"]},
+            {self.user1.username, self.user2.username},
+        )
+
+        out = StringIO()
+        call_command("rebuild_similar_profiles", "--full", stdout=out)
+        self.assertIn("for 3 profiles", out.getvalue())
+
+        response = self.client.get(
+            self.similar_url.replace("<str:username>", "no-such-user")
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @patch.object(SimilarProfileQuerySet, "stored_per_profile", 1)
+    def test_similar_profiles_incremental(self):
+        profile3, profile4 = (
+            Profile.objects.get(
+                user=get_user_model().objects.create_user(
+                    first_name=name,
+                    last_name="Dev",
+                    email=f"{name.lower()}dev@example.com",
+                    password="Otherdev123@",
+                )
+            )
+            for name in ("Third", "Fourth")
+        )
+        skills = {
+            name: TestUtil.create_skill(name)
+            for name in ("django", "sql", "css", "go")
+        }
+        for profile, names in (
+            (self.profile1, ["django", "sql", "css"]),
+            (self.profile2, ["django", "sql"]),
+            (profile3, ["css"]),
+            (profile4, ["go"]),
+        ):
+            for name in names:
+                ProfileSkill.objects.create(profile=profile, skill=skills[name])
+        call_command("rebuild_similar_profiles", "--full", stdout=StringIO())
+
+        def similar():
+            return {
+                (link.profile_id, link.similar_id, round(link.score, 4))
+                for link in SimilarProfile.objects.all()
+            }
+
+        # profile1 ranks profile2 first, but stays profile3's best match and
+        # becomes profile4's, whose list was empty
+        ProfileSkill.objects.create(profile=self.profile1, skill=skills["go"])
+        call_command("rebuild_similar_profiles", stdout=StringIO())
+        incremental = similar()
+        listed = {(profile, other) for profile, other, _ in incremental}
+        self.assertIn((profile3.pk, self.profile1.pk), listed)
+        self.assertIn((profile4.pk, self.profile1.pk), listed)
+
+        call_command("rebuild_similar_profiles", "--full", stdout=StringIO())
+        self.assertEqual(incremental, similar())
+
+    def test_profile_export(self):
+        skill = TestUtil.create_skill("Django")
+        ProfileSkill.objects.create(profile=self.profile1, skill=skill)
+
+        # Unauthenticated User
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.export_url, {"output": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode()
+        rows = {row["username"]: row for row in csv.DictReader(StringIO(content))}
+        self.assertEqual(set(rows), {self.user1.username, self.user2.username})
+        self.assertEqual(rows[self.user1.username]["skill_names"], skill.name)
+
+        # A change to the user row counts as a change to the profile
+        since = response["X-Export-Started"]
+        self.user2.first_name = "Renamed"
+        self.user2.save()
+        response = self.client.get(
+            self.export_url, {"output": "csv", "updated_since": since}
+        )
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row["first_name"] for row in rows], ["Renamed"])
+
     def test_skill_post(self):
         # Authenticated User
         self.client.force_authenticate(user=self.user1)
@@ -97,6 +459,108 @@ class TestProfiles(APITestCase):
         )
         self.assertEqual(response.status_code, 401)
 
+    def test_skill_autocomplete(self):
+        TestUtil.add_skill("djangorest", "APIs", self.profile1)
+        django = TestUtil.add_skill("django", "Backend work", self.profile1)
+        ProfileSkill.objects.create(profile=self.profile2, skill=django)
+        TestUtil.add_skill("flask", "Microservices", self.profile2)
+
+        # Prefix match, most used first
+        response = self.client.get(self.skill_autocomplete_url, {"q": "DJ"})
+        self.assertEqual(response.status_code, 200)
+        suggestions = [
+            (skill["name"], skill["profile_count"]) for skill in response.data["data"]
+        ]
+        self.assertEqual(suggestions, [("django", 2), ("djangorest", 1)])
+
+        response = self.client.get(self.skill_autocomplete_url, {"q": "dj", "limit": 1})
+        self.assertEqual(len(response.data["data"]), 1)
+
+        # The counter follows removals
+        ProfileSkill.objects.filter(profile=self.profile2, skill=django).delete()
+        django.refresh_from_db()
+        self.assertEqual(django.profile_count, 1)
+
+        response = self.client.get(self.skill_autocomplete_url)
+        self.assertEqual(response.data["data"], [])
+
+    def test_skill_bulk_replace(self):
+        TestUtil.add_skill("flask", "Microservices", self.profile1)
+        TestUtil.add_skill("django", "Backend work", self.profile1)
+        TestUtil.add_skill("react", "Frontend", self.profile2)
+        payload = {
+            "skills": [
+                {"name": "Django", "description": "APIs and admin"},
+                {"name": "react", "description": "Dashboards"},
+                {"name": "Postgres"},
+            ]
+        }
+
+        # Unauthenticated User
+        response = self.client.put(self.skill_bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.put(self.skill_bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(skill["name"], skill["description"]) for skill in response.data["data"]],
+            [
+                ("django", "APIs and admin"),
+                ("postgres", ""),
+                ("react", "Dashboards"),
+            ],
+        )
+
+        # Counters, search document and cached profile follow the replace
+        self.assertEqual(
+            dict(Skill.objects.values_list("name", "profile_count")),
+            {"django": 1, "flask": 0, "postgres": 1, "react": 2},
+        )
+        response = self.client.get(self.profile_list_url, {"search": "postgres"})
+        self.assertEqual(len(response.data["data"]["results"]), 1)
+        response = self.client.get(
+            self.profile_url.replace("<str:username>", self.user1.username)
+        )
+        self.assertEqual(len(response.data["data"]["skills"]), 3)
+
+        # An empty list clears the profile's skills, with a single DELETE
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                self.skill_bulk_url, {"skills": []}, format="json"
+            )
+        self.assertEqual(response.data["data"], [])
+        deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(
+            dict(Skill.objects.values_list("name", "profile_count")),
+            {"django": 0, "flask": 0, "postgres": 0, "react": 1},
+        )
+        response = self.client.get(
+            self.profile_url.replace("<str:username>", self.user1.username)
+        )
+        self.assertEqual(response.data["data"]["skills"], [])
+
+        # A link written concurrently is skipped by the insert and not counted twice
+        ensure = SkillQuerySet.ensure
+
+        def ensure_racing(queryset, names):
+            skill_ids = ensure(queryset, names)
+            ProfileSkill.objects.create(profile=self.profile1, skill_id=skill_ids["go"])
+            return skill_ids
+
+        with patch.object(SkillQuerySet, "ensure", ensure_racing):
+            response = self.client.put(
+                self.skill_bulk_url, {"skills": [{"name": "go"}]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Skill.objects.get(name="go").profile_count, 1)
+
+        response = self.client.put(
+            self.skill_bulk_url, {"skills": [{"description": "No name"}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 422)
+
     def test_skill_patch(self):
         skill = TestUtil.add_skill(
             "Django",
@@ -191,4 +655,60 @@ class TestProfiles(APITestCase):
         self.assertEqual(response.status_code, 401)
 
 
+    def test_avatar_update(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage"
+            },
+        }
+        self.client.force_authenticate(user=self.user1)
+
+        buffer = BytesIO()
+        Image.new("RGB", (3000, 1500), color="blue").save(buffer, format="JPEG")
+        upload = SimpleUploadedFile(
+            "photo.jpg", buffer.getvalue(), content_type="image/jpeg"
+        )
+
+        with override_settings(
+            STORAGES=storages, MEDIA_ROOT=media_root, IMAGE_WORKERS=0
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    self.avatar_url, {"avatar": upload}, format="multipart"
+                )
+            self.assertEqual(response.status_code, 200)
+
+            # The stored original is downscaled to IMAGE_MAX_DIMENSION
+            self.profile1.refresh_from_db()
+            with Image.open(self.profile1.avatar.path) as image:
+                self.assertEqual(image.size, (2048, 1024))
+
+            # Variants are written after commit and exposed with the profile
+            self.assertEqual(
+                set(self.profile1.avatar_variants), {"thumbnail", "medium", "large"}
+            )
+            thumbnail = self.profile1.avatar_variants["thumbnail"]
+            with Image.open(self.profile1.avatar.storage.path(thumbnail)) as image:
+                self.assertEqual((image.format, image.size), ("WEBP", (160, 80)))
+
+            response = self.client.get(
+                self.profile_url.replace("<str:username>", self.user1.username)
+            )
+            self.assertEqual(
+                set(response.data["data"]["avatar_variants"]),
+                {"thumbnail", "medium", "large"},
+            )
+
+            # Not an image
+            upload = SimpleUploadedFile(
+                "notes.jpg", b"not an image", content_type="image/jpeg"
+            )
+            response = self.client.patch(
+                self.avatar_url, {"avatar": upload}, format="multipart"
+            )
+            self.assertEqual(response.status_code, 422)
+
 # python manage.py test apps.profiles.tests.TestProfiles.test_skill_create_post
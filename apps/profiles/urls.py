@@ -5,7 +5,11 @@ from . import views
 urlpatterns = [
     path("", views.ProfileListGenericView.as_view()),
     path("image/", views.AvatarUpdateView.as_view()),
+    path("actions/export/", views.ProfileExportView.as_view()),
     path("skills/", views.SkillListCreateGenericView.as_view()),
+    path("skills/autocomplete/", views.SkillAutocompleteView.as_view()),
+    path("skills/bulk/", views.SkillBulkReplaceView.as_view()),
     path("skills/<uuid:id>/", views.SkillUpdateDestroyView.as_view()),
+    path("<str:username>/similar/", views.SimilarProfilesView.as_view()),
     path("<str:username>/", views.ProfileRetrieveUpdateView.as_view()),
 ]
@@ -1,24 +1,37 @@
-from django.db.models import Prefetch
+from django.db.models.functions import Greatest
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Q
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListAPIView, ListCreateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.cache import cache_anonymous_response, conditional_response
 from apps.common.exceptions import NotFoundError
+from apps.common.export import EXPORT_FORMATS, ExportView
+from apps.common.filters import FullTextSearchFilter
 from apps.common.pagination import DefaultPagination
 from apps.common.responses import CustomResponse
+from apps.common.schema_examples import (
+    EXPORT_PARAMETERS,
+    SPARSE_FIELDSET_PARAMETERS,
+)
 
+from apps.profiles.cache import cache_profile, get_cached_profile
 from apps.profiles.filters import ProfileFilter
+from apps.profiles.managers import SEARCH_CONFIG
 from apps.profiles.schema_examples import (
     IMAGE_UPDATE_RESPONSE_EXAMPLE,
     PROFILE_DETAIL_RESPONSE_EXAMPLE,
     PROFILE_LIST_RESPONSE_EXAMPLE,
     PROFILE_UPDATE_RESPONSE_EXAMPLE,
+    SIMILAR_PROFILES_RESPONSE_EXAMPLE,
+    SKILL_AUTOCOMPLETE_RESPONSE_EXAMPLE,
+    SKILL_BULK_REPLACE_RESPONSE_EXAMPLE,
     SKILL_CREATE_RESPONSE_EXAMPLE,
     SKILL_DELETE_RESPONSE_EXAMPLE,
     SKILL_LIST_RESPONSE_EXAMPLE,
@@ -26,13 +39,16 @@ from apps.profiles.schema_examples import (
     build_avatar_request_schema,
 )
 
-from .models import Profile, ProfileSkill, Skill
+from .models import Profile, ProfileSkill, SimilarProfile, Skill
 from .serializers import (
     AvatarSerializer,
     ProfileSerializer,
+    ProfileSkillBulkSerializer,
     ProfileSkillCreateSerializer,
     ProfileSkillSerializer,
     ProfileUpdateSerializer,
+    SimilarProfileSerializer,
+    SkillAutocompleteSerializer,
     SkillSerializer,
 )
 
@@ -62,36 +78,52 @@ class ProfileRetrieveUpdateView(APIView):
         )
         return serializer_class(*args, **kwargs)
 
+    def get_last_modified(self, request, username):
+        self.cached_profile, self.profile_generation = get_cached_profile(username)
+        if self.cached_profile is not None:
+            return self.cached_profile["last_modified"]
+
+        # Skill writes touch `updated`; names and email live on the user
+        return (
+            Profile.objects.filter(user__username=username)
+            .annotate(last_modified=Greatest("updated", "user__updated_at"))
+            .values_list("last_modified", flat=True)
+            .first()
+        )
+
     @extend_schema(
         summary="View a user's profile details",
         description="View any user's public profile or your own private profile details.",
         tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses=PROFILE_DETAIL_RESPONSE_EXAMPLE,
     )
+    @conditional_response(get_last_modified)
     def get(self, request, username):
-        try:
-            profile = (
-                Profile.objects.select_related("user")
-                .prefetch_related(
-                    Prefetch(
-                        "profileskill_set",
-                        queryset=ProfileSkill.objects.select_related("skill").order_by(
-                            "skill__name"
-                        ),
-                    )
-                )
-                .get(user__username=username)
-            )
+        selected = ProfileSerializer.selected_fields(request)
+        entry = getattr(self, "cached_profile", None)
+        if entry is None:
+            # The full representation is cached; sparse requests are cut from it
+            try:
+                profile = ProfileSerializer.prepare_queryset(
+                    Profile.objects.all(), request=None
+                ).get(user__username=username)
+            except Profile.DoesNotExist:
+                raise NotFoundError(err_msg="Profile not found.")
 
             serializer = self.get_serializer(profile)
-            return CustomResponse.success(
-                message="Profile detail retrieved successfully.",
-                data=serializer.data,
-                status_code=status.HTTP_200_OK,
+            entry = cache_profile(
+                username,
+                self.profile_generation,
+                serializer.data,
+                last_modified=max(profile.updated, profile.user.updated_at),
             )
 
-        except Profile.DoesNotExist:
-            raise NotFoundError(err_msg="Profile not found.")
+        return CustomResponse.success(
+            message="Profile detail retrieved successfully.",
+            data={name: entry["data"][name] for name in selected},
+            status_code=status.HTTP_200_OK,
+        )
 
     @extend_schema(
         summary="Update user profile",
@@ -116,20 +148,51 @@ class ProfileRetrieveUpdateView(APIView):
         )
 
 
-class ProfileListGenericView(ListAPIView):
-    queryset = Profile.objects.select_related("user").prefetch_related(
-        Prefetch(
-            "profileskill_set",
-            queryset=ProfileSkill.objects.select_related("skill").order_by(
-                "skill__name"
-            ),
-        )
+class SimilarProfilesView(APIView):
+    """
+    API view to retrieve the developers most similar to a profile.
+    """
+
+    permission_classes = (AllowAny,)
+    serializer_class = SimilarProfileSerializer
+    limit = 10
+
+    @extend_schema(
+        summary="View developers similar to a profile",
+        description="This endpoint allows authenticated and unauthenticated users to discover developers with skills similar to a given profile. Matches are ranked by skill overlap, with rare skills counting more than common ones, and are refreshed periodically.",
+        tags=tags,
+        responses=SIMILAR_PROFILES_RESPONSE_EXAMPLE,
     )
+    @cache_anonymous_response("profiles")
+    def get(self, request, username):
+        # Precomputed neighbours, already ranked by similarity
+        links = list(
+            SimilarProfile.objects.filter(profile__user__username=username)
+            .select_related("similar__user")
+            .defer("similar__bio", "similar__search_vector")[: self.limit]
+        )
+        if not links and not Profile.objects.filter(user__username=username).exists():
+            raise NotFoundError(err_msg="Profile not found.")
+
+        serializer = self.serializer_class(links, many=True)
+        return CustomResponse.success(
+            message="Similar profiles retrieved successfully.",
+            data=serializer.data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class ProfileListGenericView(ListAPIView):
+    queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
-    filter_backends = (DjangoFilterBackend, SearchFilter)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = ProfileFilter
-    search_fields = ["bio", "short_intro", "skills__name"]
+    search_config = SEARCH_CONFIG
     pagination_class = DefaultPagination
+    facet_limit = 50
+
+    def get_queryset(self):
+        return ProfileSerializer.prepare_queryset(super().get_queryset(), self.request)
 
     @extend_schema(
         summary="Retrieve a list of user profiles",
@@ -137,16 +200,33 @@ class ProfileListGenericView(ListAPIView):
         parameters=[
             OpenApiParameter(
                 name="search",
-                description="Search across bio, short intro, and skills.",
+                description=(
+                    "Full-text search across name, skills, short intro, bio, "
+                    "and location, ordered by relevance."
+                ),
             ),
             OpenApiParameter(
                 name="skills",
-                description=("Filter profiles by skllls."),
+                description=(
+                    "Filter profiles by skills. Typo-tolerant, ranked by similarity."
+                ),
             ),
             OpenApiParameter(
                 name="location",
-                description=("Filter profiles by location."),
+                description=(
+                    "Filter profiles by location, e.g. `Lagos, Nigeria`, `lagos ng` "
+                    "or just `Nigeria`. Spellings are normalized to a known place."
+                ),
             ),
+            OpenApiParameter(
+                name="facets",
+                description=(
+                    "Set to `location` to include the number of matching "
+                    "profiles per location."
+                ),
+                enum=["location"],
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
         ],
         operation_id="list_profiles",
         tags=["Profiles"],
@@ -165,6 +245,10 @@ class ProfileListGenericView(ListAPIView):
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             paginated_data = self.get_paginated_response(serializer.data)
+            if request.query_params.get("facets") == "location":
+                paginated_data.data["facets"] = {
+                    "location": queryset.location_facets(limit=self.facet_limit)
+                }
             return CustomResponse.success(
                 message="Profiles retrieved successfully.",
                 data=paginated_data.data,
@@ -179,6 +263,48 @@ class ProfileListGenericView(ListAPIView):
         )
 
 
+class ProfileExportView(ExportView):
+    filename = "profiles"
+    export_fields = (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "short_intro",
+        "bio",
+        "location",
+        "skill_names",
+        "social_github",
+        "social_stackoverflow",
+        "social_twitter",
+        "social_linkedin",
+        "social_website",
+        "created",
+        "updated",
+    )
+
+    def get_rows(self, updated_since):
+        profiles = Profile.objects.all()
+        if updated_since:
+            profiles = profiles.filter(
+                Q(updated__gte=updated_since) | Q(user__updated_at__gte=updated_since)
+            )
+        return profiles.export_rows()
+
+    @extend_schema(
+        summary="Export the developer directory",
+        description="This endpoint allows authenticated users to download every developer profile, with its skill names, as newline-delimited JSON or CSV. The response is streamed, so it starts right away whatever the directory size. Pass `updated_since` to only get the profiles changed since a previous export; deleted profiles are not reported.",
+        tags=tags,
+        parameters=EXPORT_PARAMETERS,
+        responses={
+            (200, media_type): OpenApiTypes.STR
+            for media_type in EXPORT_FORMATS.values()
+        },
+    )
+    def get(self, request):
+        return super().get(request)
+
+
 class AvatarUpdateView(APIView):
     serializer_class = AvatarSerializer
     permission_classes = [IsAuthenticated]
@@ -209,6 +335,7 @@ class SkillListCreateGenericView(ListCreateAPIView):
     queryset = Skill.objects.all()
     permission_classes = (IsAuthenticated,)
     pagination_class = DefaultPagination
+    cursor_ordering = ("name",)
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -289,6 +416,76 @@ class SkillCreateView(APIView):
         )
 
 
+class SkillAutocompleteView(APIView):
+    permission_classes = (AllowAny,)
+    serializer_class = SkillAutocompleteSerializer
+    default_limit = 10
+    max_limit = 25
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    @extend_schema(
+        summary="Autocomplete skill names",
+        description="This endpoint allows authenticated and unauthenticated users to look up skills by name prefix. Suggestions are ordered by the number of profiles that list each skill.",
+        parameters=[
+            OpenApiParameter(name="q", description="Skill name prefix."),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description="Maximum number of suggestions (1-25, default 10).",
+            ),
+        ],
+        tags=tags,
+        responses=SKILL_AUTOCOMPLETE_RESPONSE_EXAMPLE,
+    )
+    @cache_anonymous_response("profiles")
+    def get(self, request):
+        prefix = request.query_params.get("q", "").strip()
+        skills = (
+            Skill.objects.autocomplete(prefix, limit=self.get_limit(request))
+            if prefix
+            else Skill.objects.none()
+        )
+        serializer = self.serializer_class(skills, many=True)
+        return CustomResponse.success(
+            message="Skill suggestions retrieved successfully.",
+            data=serializer.data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class SkillBulkReplaceView(APIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ProfileSkillBulkSerializer
+
+    @extend_schema(
+        summary="Replace all skills on your profile",
+        description="This endpoint allows authenticated users to set their full skill list in one request. Skills not in the list are removed, new ones are added (creating the skill if needed) and changed descriptions are updated.",
+        tags=tags,
+        request=ProfileSkillBulkSerializer,
+        responses=SKILL_BULK_REPLACE_RESPONSE_EXAMPLE,
+    )
+    def put(self, request):
+        profile = request.user.profile
+        serializer = self.serializer_class(profile, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        profile_skills = profile.profileskill_set.select_related("skill").order_by(
+            "skill__name"
+        )
+        return CustomResponse.success(
+            message="Skills updated successfully.",
+            data=ProfileSkillSerializer(profile_skills, many=True).data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
 class SkillUpdateDestroyView(APIView):  # detail, edit, delete
     permission_classes = (IsAuthenticated,)  # 1 - check auth
     serializer_class = ProfileSkillSerializer
@@ -3,7 +3,7 @@ from .models import Tag, Project, Review
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'created')
+    list_display = ('name', 'project_count', 'created')
     search_fields = ('name',)
     list_filter = ('created',) 
     list_per_page = 10
@@ -13,7 +13,7 @@ class ProjectAdmin(admin.ModelAdmin):
     list_display = ('title', 'owner', 'vote_total', 'vote_ratio')
     search_fields = ('title', 'description', 'owner__user__username', 'tags__name')  
     list_filter = ('created', 'updated')  
-    readonly_fields = ('slug', 'vote_total', 'vote_ratio', 'updated')  
+    readonly_fields = ('slug', 'vote_total', 'up_votes', 'vote_ratio', 'updated')  
     filter_horizontal = ('tags',)  # Display tags in a horizontal filter widget
     list_per_page = 10
     
@@ -28,6 +28,7 @@ class ProjectAdmin(admin.ModelAdmin):
         'demo_link',
         'tags',
         'vote_total',
+        'up_votes',
         'vote_ratio',
         'updated',
     )
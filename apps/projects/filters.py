@@ -1,10 +1,11 @@
 from django_filters import rest_framework as filters
 
+from apps.common.filters import TrigramFilter
 from apps.projects.models import Project
 
 class ProjectFilter(filters.FilterSet):
-    tags = filters.CharFilter(field_name='tags__name', lookup_expr='icontains')  
+    tags = TrigramFilter(field_name='tags__name')
 
     class Meta:
         model = Project
-        fields = ['tags']
\ No newline at end of file
+        fields = ['tags']
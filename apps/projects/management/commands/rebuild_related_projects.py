@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.projects.models import Project, RelatedProject
+
+
+class Command(BaseCommand):
+    help = "Recomputes the precomputed related-projects table from project tags."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of projects rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        project_ids = Project.objects.values_list("id", flat=True).iterator(
+            chunk_size=batch_size
+        )
+
+        total = 0
+        batch = []
+        for project_id in project_ids:
+            batch.append(project_id)
+            if len(batch) == batch_size:
+                RelatedProject.objects.rebuild(batch)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            RelatedProject.objects.rebuild(batch)
+            total += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt related projects for {total} projects.")
+        )
@@ -0,0 +1,286 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Min,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Now
+from django.db.models.lookups import GreaterThan
+
+SEARCH_CONFIG = "english"
+
+
+def vote_ratio_expression(up_votes, vote_total):
+    """Percentage of up votes, truncated like the integer column it is stored in."""
+    return Case(
+        When(GreaterThan(vote_total, 0), then=up_votes * Value(100) / vote_total),
+        default=Value(0),
+    )
+
+
+class TagQuerySet(models.QuerySet):
+    def ensure(self, names):
+        """
+        Map each tag name to its id, creating the missing tags.
+
+        Existing names are skipped by the insert rather than looked up first,
+        so a tag created concurrently can't make this fail.
+        """
+        if not names:
+            return {}
+        self.bulk_create(
+            [self.model(name=name) for name in names], ignore_conflicts=True
+        )
+        return dict(self.filter(name__in=names).values_list("name", "pk"))
+
+    def apply_project_delta(self, delta):
+        """Shift the denormalized project counters in a single UPDATE."""
+        return self.update(project_count=F("project_count") + delta)
+
+    def recount_projects(self):
+        """Rebuild the project counters from the project/tag links."""
+        Project = self.model._meta.get_field("project").related_model
+        counts = (
+            Project.objects.filter(tags=OuterRef("pk"))
+            .order_by()
+            .values("tags")
+            .annotate(c=Count("pk"))
+            .values("c")
+        )
+        return self.update(project_count=Coalesce(Subquery(counts), 0))
+
+
+class ProjectQuerySet(models.QuerySet):
+    def build_search_vector(self):
+        """
+        Weighted search document: title (A) > tag names (B) > description (C).
+        Tag names are aggregated in a correlated subquery so the vector can be
+        written with a single UPDATE.
+        """
+        Tag = self.model._meta.get_field("tags").related_model
+        tag_names = Subquery(
+            Tag.objects.filter(project=OuterRef("pk"))
+            .values("project")
+            .annotate(names=StringAgg("name", delimiter=" "))
+            .values("names")[:1]
+        )
+        return (
+            SearchVector("title", weight="A", config=SEARCH_CONFIG)
+            + SearchVector(tag_names, weight="B", config=SEARCH_CONFIG)
+            + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+        )
+
+    def update_search_vector(self):
+        """Recompute the stored search document for every project in the queryset."""
+        return self.update(search_vector=self.build_search_vector())
+
+    def apply_vote_delta(self, total=0, up=0):
+        """
+        Shift the denormalized vote counters in a single UPDATE.
+
+        Every right-hand side reads the pre-update row, so the ratio is derived
+        from the same counts it is written alongside. `updated` moves with the
+        counters since they are part of the project's representation.
+        """
+        new_total = F("vote_total") + total
+        new_up = F("up_votes") + up
+        return self.update(
+            vote_total=new_total,
+            up_votes=new_up,
+            vote_ratio=vote_ratio_expression(new_up, new_total),
+            updated=Now(),
+        )
+
+    def tag_facets(self, limit=None):
+        """
+        Number of projects per tag within this queryset, most used first, as
+        `{"name", "count"}` dicts.
+
+        A filtered queryset is grouped over the project/tag links in one
+        query; the unfiltered catalog reads the maintained `Tag.project_count`.
+        """
+        Tag = self.model._meta.get_field("tags").related_model
+        if not self.query.where:
+            facets = (
+                Tag.objects.filter(project_count__gt=0)
+                .order_by("-project_count", "name")
+                .values("name", count=F("project_count"))
+            )
+        else:
+            facets = (
+                self.model.tags.through.objects.filter(
+                    project__in=self.order_by().values("pk")
+                )
+                .values(name=F("tag__name"))
+                .annotate(count=Count("pk"))
+                .order_by("-count", "name")
+            )
+        return list(facets[:limit])
+
+    def refresh_denormalized(self):
+        """
+        Bring search vectors, tag counters and related-project links up to
+        date for projects written without signals (e.g. by bulk_create).
+        """
+        Tag = self.model._meta.get_field("tags").related_model
+        RelatedProject = self.model._meta.get_field("related_links").related_model
+
+        project_ids = list(self.values_list("pk", flat=True))
+        self.update_search_vector()
+        Tag.objects.filter(
+            pk__in=self.model.tags.through.objects.filter(
+                project_id__in=project_ids
+            ).values("tag_id")
+        ).recount_projects()
+        for project_id in project_ids:
+            RelatedProject.objects.refresh_project(project_id)
+
+    def export_rows(self):
+        """
+        Flat dicts for catalog exports, unordered. Tag names come from a
+        correlated subquery, so an export streams as a single query.
+        """
+        Tag = self.model._meta.get_field("tags").related_model
+        return self.order_by().values(
+            "id",
+            "slug",
+            "title",
+            "description",
+            "source_link",
+            "demo_link",
+            "vote_total",
+            "up_votes",
+            "vote_ratio",
+            "created",
+            "updated",
+            owner_username=F("owner__user__username"),
+            tag_names=ArraySubquery(
+                Tag.objects.filter(project=OuterRef("pk"))
+                .order_by("name")
+                .values("name")
+            ),
+        )
+
+    def touch(self):
+        """Mark the projects as modified after a change to related rows."""
+        return self.update(updated=Now())
+
+    def recount_votes(self):
+        """Rebuild the vote counters from the reviews table."""
+        Review = self.model._meta.get_field("reviews").related_model
+        reviews = Review.objects.filter(project=OuterRef("pk")).order_by()
+
+        def count(queryset):
+            return Coalesce(
+                Subquery(
+                    queryset.values("project").annotate(c=Count("pk")).values("c")
+                ),
+                0,
+            )
+
+        self.update(
+            vote_total=count(reviews), up_votes=count(reviews.filter(value="up"))
+        )
+        return self.update(
+            vote_ratio=vote_ratio_expression(F("up_votes"), F("vote_total"))
+        )
+
+
+class RelatedProjectQuerySet(models.QuerySet):
+    """
+    Precomputed "related projects" links, scored by the Jaccard similarity of
+    the two projects' tag sets and capped at `stored_per_project` per project.
+    """
+
+    stored_per_project = 10
+
+    def score_candidates(self, project_id, capped=True):
+        """
+        Top tag-overlap neighbours of a project as (related_id, score) pairs,
+        or every project sharing a tag with it if not `capped`.
+        """
+        Project = self.model._meta.get_field("project").related_model
+        ProjectTag = Project.tags.through
+
+        own_tags = ProjectTag.objects.filter(project_id=project_id).values("tag_id")
+        own_count = len(own_tags)
+        if not own_count:
+            return []
+
+        tag_count = Subquery(
+            ProjectTag.objects.filter(project_id=OuterRef("project_id"))
+            .order_by()
+            .values("project_id")
+            .annotate(c=Count("pk"))
+            .values("c")
+        )
+        candidates = (
+            ProjectTag.objects.filter(tag_id__in=own_tags)
+            .exclude(project_id=project_id)
+            .order_by()
+            .values("project_id")
+            .annotate(shared=Count("pk"), tag_count=tag_count)
+            .annotate(
+                score=Cast("shared", models.FloatField())
+                / (own_count + F("tag_count") - F("shared"))
+            )
+            .order_by("-score", "project_id")
+            .values_list("project_id", "score")
+        )
+        return list(candidates[: self.stored_per_project] if capped else candidates)
+
+    def rebuild(self, project_ids):
+        """Recompute the stored neighbours of the given projects."""
+        with transaction.atomic():
+            self.filter(project_id__in=project_ids).delete()
+            self.bulk_create(
+                self.model(project_id=project_id, related_id=related_id, score=score)
+                for project_id in project_ids
+                for related_id, score in self.score_candidates(project_id)
+            )
+
+    def refresh_project(self, project_id):
+        """
+        Incremental update after a project's tags changed, leaving the table
+        as a full rebuild would.
+
+        The project's own list is rebuilt, and so is every list it appeared
+        in: its old score there is stale, and dropping it may let another
+        neighbour back in. So is every list it may now enter: those of the
+        projects sharing a tag with it that are short of the cap or whose
+        lowest score doesn't beat their new score with the project.
+        """
+        with transaction.atomic():
+            referrers = set(
+                self.filter(related_id=project_id).values_list("project_id", flat=True)
+            )
+            self.rebuild([project_id, *referrers])
+
+            scores = {
+                other: score
+                for other, score in self.score_candidates(project_id, capped=False)
+                if other not in referrers
+            }
+            stored = dict.fromkeys(scores, (0, None))
+            stored.update(
+                (row["project_id"], (row["stored"], row["lowest"]))
+                for row in self.filter(project_id__in=scores)
+                .order_by()
+                .values("project_id")
+                .annotate(stored=Count("pk"), lowest=Min("score"))
+            )
+            self.rebuild(
+                [
+                    other
+                    for other, (count, lowest) in stored.items()
+                    if count < self.stored_per_project or lowest <= scores[other]
+                ]
+            )
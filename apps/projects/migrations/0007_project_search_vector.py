@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-17 17:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+SEARCH_CONFIG = "english"
+
+
+def populate_search_vector(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Tag = apps.get_model("projects", "Tag")
+    tag_names = Subquery(
+        Tag.objects.filter(project=OuterRef("pk"))
+        .values("project")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")[:1]
+    )
+    Project.objects.update(
+        search_vector=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(tag_names, weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_profile_skills_alter_profileskill_profile_and_more'),
+        ('projects', '0006_alter_tag_options_alter_project_featured_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='projects_pr_search__1d35f9_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
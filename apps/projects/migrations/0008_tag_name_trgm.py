@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 17:17
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_trigram_indexes'),
+        ('projects', '0007_project_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tag',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='tag_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
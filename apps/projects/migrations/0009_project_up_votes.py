@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-17 17:20
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+
+
+def recount_votes(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Review = apps.get_model("projects", "Review")
+    reviews = Review.objects.filter(project=OuterRef("pk")).order_by()
+
+    def count(queryset):
+        return Coalesce(
+            Subquery(queryset.values("project").annotate(c=Count("pk")).values("c")),
+            0,
+        )
+
+    Project.objects.update(
+        vote_total=count(reviews), up_votes=count(reviews.filter(value="up"))
+    )
+    Project.objects.update(
+        vote_ratio=Case(
+            When(
+                GreaterThan(F("vote_total"), 0),
+                then=F("up_votes") * Value(100) / F("vote_total"),
+            ),
+            default=Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_tag_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='up_votes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(recount_votes, migrations.RunPython.noop),
+    ]
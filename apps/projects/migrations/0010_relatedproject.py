@@ -0,0 +1,78 @@
+# Generated by Django 5.1 on 2026-10-17 17:25
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+STORED_PER_PROJECT = 10
+BATCH_SIZE = 500
+
+
+def score_candidates(ProjectTag, project_id):
+    own_tags = ProjectTag.objects.filter(project_id=project_id).values("tag_id")
+    own_count = len(own_tags)
+    if not own_count:
+        return []
+
+    tag_count = Subquery(
+        ProjectTag.objects.filter(project_id=OuterRef("project_id"))
+        .order_by()
+        .values("project_id")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    candidates = (
+        ProjectTag.objects.filter(tag_id__in=own_tags)
+        .exclude(project_id=project_id)
+        .order_by()
+        .values("project_id")
+        .annotate(shared=Count("pk"), tag_count=tag_count)
+        .annotate(
+            score=Cast("shared", models.FloatField())
+            / (own_count + F("tag_count") - F("shared"))
+        )
+        .order_by("-score", "project_id")
+        .values_list("project_id", "score")
+    )
+    return list(candidates[:STORED_PER_PROJECT])
+
+
+def build_related_projects(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    RelatedProject = apps.get_model("projects", "RelatedProject")
+    ProjectTag = Project.tags.through
+    project_ids = list(Project.objects.values_list("id", flat=True))
+    for start in range(0, len(project_ids), BATCH_SIZE):
+        RelatedProject.objects.bulk_create(
+            RelatedProject(project_id=project_id, related_id=related_id, score=score)
+            for project_id in project_ids[start : start + BATCH_SIZE]
+            for related_id, score in score_candidates(ProjectTag, project_id)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_project_up_votes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('score', models.FloatField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='projects.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['project', '-score'], name='projects_re_project_2c97a3_idx')],
+                'unique_together': {('project', 'related')},
+            },
+        ),
+        migrations.RunPython(build_related_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 17:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_projects(apps, schema_editor):
+    Tag = apps.get_model("projects", "Tag")
+    Project = apps.get_model("projects", "Project")
+    counts = (
+        Project.objects.filter(tags=OuterRef("pk"))
+        .order_by()
+        .values("tags")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    Tag.objects.update(project_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_relatedproject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='project_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount_projects, migrations.RunPython.noop),
+    ]
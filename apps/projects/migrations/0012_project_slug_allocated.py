@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 17:38
+
+import apps.common.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_tag_project_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='slug',
+            field=apps.common.fields.AllocatedSlugField(always_update=True, editable=False, populate_from='title', unique=True),
+        ),
+    ]
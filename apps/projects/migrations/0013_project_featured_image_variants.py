@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_project_slug_allocated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='featured_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
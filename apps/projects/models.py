@@ -1,18 +1,27 @@
-from autoslug import AutoSlugField
-from django.db import models
-from django.db.models import Count, Q
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 
+from apps.common.fields import AllocatedSlugField
 from apps.common.models import BaseModel
 from apps.profiles.models import Profile
 
+from .managers import ProjectQuerySet, RelatedProjectQuerySet, TagQuerySet
+
 
 class Tag(BaseModel):
     name = models.CharField(max_length=50, unique=True)
+    project_count = models.IntegerField(default=0, editable=False)
+
+    objects = TagQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
         indexes = [
             models.Index(fields=["name"]),
+            GinIndex(
+                fields=["name"], name="tag_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
         ]
 
     def clean(self):
@@ -25,26 +34,34 @@ class Tag(BaseModel):
 
 class Project(BaseModel):
     title = models.CharField(max_length=255)
-    slug = AutoSlugField(populate_from="title", always_update=True, unique=True)
+    slug = AllocatedSlugField(populate_from="title", always_update=True, unique=True)
     owner = models.ForeignKey(
         Profile, related_name="projects", on_delete=models.CASCADE
     )
     featured_image = models.ImageField(
         upload_to="featured_image/", null=True, blank=True
     )
+    featured_image_variants = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
     description = models.TextField()
     source_link = models.CharField(max_length=200, blank=True)
     demo_link = models.CharField(max_length=200, blank=True)
     tags = models.ManyToManyField(Tag)
     vote_total = models.IntegerField(default=0)
     vote_ratio = models.IntegerField(default=0)
+    up_votes = models.IntegerField(default=0)
     updated = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ["title"]
         indexes = [
             models.Index(fields=["-created"]),
             models.Index(fields=["title", "description"]),
+            GinIndex(fields=["search_vector"]),
         ]
 
     @property
@@ -63,50 +80,25 @@ class Project(BaseModel):
         queryset = self.reviews.all().values_list("reviewer__id", flat=True)
         return queryset
 
-    # @property
-    # def review_percentage(self) -> int:
-    #     """
-    #     Calculate the positive feedback percentage based on votes.
-    #     """
-    #     reviews = self.reviews.all()
-    #     total_votes = reviews.count()
-
-    #     if total_votes > 0:
-    #         up_votes = reviews.filter(value="up").count()
-    #         ratio = (up_votes / total_votes) * 100
-    #         self.vote_total = total_votes
-    #         self.vote_ratio = ratio
-
-    #         self.save()
-
-    @property
-    def review_percentage(self) -> int:
-        # Skip calculation if we know there are no reviews
-        if self.vote_total == 0 and not self.reviews.exists():
-            return
-
-        if hasattr(self, "total_votes") and hasattr(self, "up_votes"):
-            total_votes = self.total_votes
-            up_votes = self.up_votes
 
-        else:
-            aggregates = self.reviews.aggregate(
-                total=Count("id"), up=Count("id", filter=Q(value="up"))
-            )
-
-            total_votes = aggregates["total"]
-            up_votes = aggregates["up"]
+class RelatedProject(BaseModel):
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="related_links"
+    )
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
 
-        if total_votes > 0:
-            ratio = (up_votes / total_votes) * 100
+    objects = RelatedProjectQuerySet.as_manager()
 
-            # Only update if values changed
-            if self.vote_total != total_votes or self.vote_ratio != ratio:
-                self.vote_total = total_votes
-                self.vote_ratio = ratio
-                print(self.vote_ratio)
+    class Meta:
+        ordering = ["-score"]
+        unique_together = ("project", "related")
+        indexes = [
+            models.Index(fields=["project", "-score"]),
+        ]
 
-                self.save(update_fields=["vote_total", "vote_ratio"])
+    def __str__(self):
+        return f"{self.project} -> {self.related} ({self.score:.2f})"
 
 
 class Review(BaseModel):
@@ -133,3 +125,15 @@ class Review(BaseModel):
 
     def __str__(self):
         return self.value
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored vote so an edit can adjust the project's counters
+        instance._loaded_value = dict(zip(field_names, values)).get("value")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The vote counters are updated from post_save, inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
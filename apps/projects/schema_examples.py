@@ -179,6 +179,45 @@ PROJECT_CREATE_RESPONSE_EXAMPLE = {
 }
 
 
+PROJECT_BULK_CREATE_RESPONSE_EXAMPLE = {
+    201: OpenApiResponse(
+        description="Projects Create Successfull",
+        response=ProjectSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                name="Success Response",
+                value={
+                    "status": SUCCESS_RESPONSE_STATUS,
+                    "message": "Projects created successfully.",
+                    "data": [PROJECT_EXAMPLE],
+                },
+            ),
+        ],
+    ),
+    401: UNAUTHORIZED_USER_RESPONSE,
+    422: OpenApiResponse(
+        response=ErrorDataResponseSerializer,
+        description="Validation Error",
+        examples=[
+            OpenApiExample(
+                name="Invalid items",
+                value={
+                    "status": ERR_RESPONSE_STATUS,
+                    "message": "Validation error",
+                    "code": ErrorCode.VALIDATION_ERROR,
+                    "data": {
+                        "projects": [
+                            {},
+                            {"title": "This field is required."},
+                        ]
+                    },
+                },
+            ),
+        ],
+    ),
+}
+
+
 PROJECT_DETAIL_RESPONSE_EXAMPLE = {
     200: OpenApiResponse(
         description="Project retrieval Successfull",
@@ -1,7 +1,10 @@
+from django.db import transaction
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from apps.common.serializers import SuccessResponseSerializer
+from apps.common.cache import invalidate_cache_tags
+from apps.common.images import ImageUploadMixin, prepare_upload, variant_urls
+from apps.common.serializers import SparseFieldsetMixin, SuccessResponseSerializer
 
 from .models import Project, Review, Tag
 
@@ -64,7 +67,65 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class FeaturedImageSerializer(serializers.ModelSerializer):
+class ProjectBulkItemSerializer(serializers.ModelSerializer):
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False, default=list
+    )
+
+    class Meta:
+        model = Project
+        fields = [
+            "title",
+            "description",
+            "source_link",
+            "demo_link",
+            "tags",
+        ]
+
+    def validate_tags(self, value):
+        # Tags are stored lowercase; keep the first occurrence of each
+        return list(dict.fromkeys(name.strip().lower() for name in value))
+
+
+class ProjectBulkCreateSerializer(serializers.Serializer):
+    projects = ProjectBulkItemSerializer(many=True, allow_empty=False, max_length=50)
+
+    def create(self, validated_data):
+        """
+        Create every project and its tag links in one transaction: missing
+        tags are inserted in one statement, and projects and links are bulk
+        inserted.
+        """
+        owner = self.context["request"].user.profile
+        items = validated_data["projects"]
+        item_tags = [item.pop("tags") for item in items]
+        names = list(dict.fromkeys(name for tags in item_tags for name in tags))
+
+        with transaction.atomic():
+            tag_ids = Tag.objects.ensure(names)
+
+            projects = [Project(owner=owner, **item) for item in items]
+            Project._meta.get_field("slug").allocate(projects)
+            Project.objects.bulk_create(projects)
+
+            ProjectTag = Project.tags.through
+            ProjectTag.objects.bulk_create(
+                ProjectTag(project_id=project.pk, tag_id=tag_ids[name])
+                for project, tags in zip(projects, item_tags)
+                for name in tags
+            )
+
+            # bulk_create sends no signals
+            Project.objects.filter(
+                pk__in=[project.pk for project in projects]
+            ).refresh_denormalized()
+            invalidate_cache_tags("projects")
+
+        return projects
+
+
+class FeaturedImageSerializer(ImageUploadMixin, serializers.ModelSerializer):
+    image_field = "featured_image"
 
     class Meta:
         model = Project
@@ -72,11 +133,15 @@ class FeaturedImageSerializer(serializers.ModelSerializer):
             "featured_image",
         ]
 
+    def validate_featured_image(self, value):
+        return prepare_upload(value) if value else value
 
-class ProjectSerializer(serializers.ModelSerializer):
+
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     owner = serializers.StringRelatedField(read_only=True)  # Display owner name
     tags = TagSerializer(many=True, read_only=True)
     featured_image_url = serializers.SerializerMethodField()
+    featured_image_variants = serializers.SerializerMethodField()
     # review_percentage = serializers.SerializerMethodField()
 
     class Meta:
@@ -87,6 +152,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             "slug",
             "owner",
             "featured_image_url",
+            "featured_image_variants",
             "description",
             "source_link",
             "demo_link",
@@ -95,19 +161,24 @@ class ProjectSerializer(serializers.ModelSerializer):
             "vote_ratio",
             # "review_percentage",
         ]
+        field_lookups = {
+            "owner": ["owner__user"],
+            "featured_image_url": ["featured_image"],
+            "featured_image_variants": ["featured_image", "featured_image_variants"],
+        }
+        deferred_columns = ["search_vector"]
 
     @extend_schema_field(serializers.URLField)
     def get_featured_image_url(self, obj):
         return obj.featured_image_url
 
+    @extend_schema_field(serializers.DictField(child=serializers.URLField()))
+    def get_featured_image_variants(self, obj):
+        return variant_urls(obj, "featured_image")
+
     # @extend_schema_field(serializers.IntegerField)
     # def get_review_percentage(self, obj):
     #     return obj.review_percentage
-    
-    def to_representation(self, instance):
-        # Trigger calculation
-        _ = instance.review_percentage
-        return super().to_representation(instance)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
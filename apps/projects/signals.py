@@ -0,0 +1,136 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from apps.common.cache import invalidate_cache_tags
+from apps.projects.models import Project, RelatedProject, Review, Tag
+
+SEARCH_SOURCE_FIELDS = {"title", "description"}
+
+
+@receiver(post_save, sender=Project)
+def refresh_project_search_vector(sender, instance, update_fields=None, **kwargs):
+    # Skip saves that can't change the search document (e.g. vote counters)
+    if update_fields is not None and not SEARCH_SOURCE_FIELDS & set(update_fields):
+        return
+    Project.objects.filter(pk=instance.pk).update_search_vector()
+
+
+def changed_project_ids(instance, action, reverse, pk_set):
+    """
+    Projects whose tag set changed in an m2m_changed event, or None for the
+    events that don't change it.
+    """
+    if reverse and action == "pre_clear":
+        # pk_set is None on clear, so remember which projects lose the tag
+        instance._cleared_project_ids = list(
+            instance.project_set.values_list("pk", flat=True)
+        )
+        return None
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return None
+
+    if not reverse:
+        return [instance.pk]
+    # tag.project_set.add(...) - pk_set holds the affected projects
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_project_ids", None)
+    return list(pk_set or ())
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def refresh_projects_on_tag_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    project_ids = changed_project_ids(instance, action, reverse, pk_set)
+    if not project_ids:
+        return
+
+    projects = Project.objects.filter(pk__in=project_ids)
+    projects.update_search_vector()
+    projects.touch()
+    for project_id in project_ids:
+        RelatedProject.objects.refresh_project(project_id)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def update_tag_counters_on_tag_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set names what was asked for, which may not all be linked
+        column = "project_id" if reverse else "tag_id"
+        links = sender.objects.filter(**{"tag" if reverse else "project": instance})
+        if pk_set is not None:
+            links = links.filter(**{f"{column}__in": pk_set})
+        instance._unlinked_ids = list(links.values_list(column, flat=True))
+        return
+
+    if action == "post_add":
+        # Django has already dropped links that existed
+        linked_ids, delta = pk_set, 1
+    elif action in ("post_remove", "post_clear"):
+        linked_ids, delta = getattr(instance, "_unlinked_ids", None), -1
+    else:
+        return
+
+    if not linked_ids:
+        return
+    if reverse:
+        Tag.objects.filter(pk=instance.pk).apply_project_delta(delta * len(linked_ids))
+    else:
+        Tag.objects.filter(pk__in=linked_ids).apply_project_delta(delta)
+
+
+@receiver(pre_delete, sender=Project)
+def update_tag_counters_on_project_delete(sender, instance, **kwargs):
+    # The links are removed by the cascade, without an m2m_changed signal
+    Tag.objects.filter(project=instance).apply_project_delta(-1)
+
+
+@receiver(post_save, sender=Tag)
+def refresh_projects_on_tag_rename(sender, instance, created, **kwargs):
+    if not created:
+        projects = Project.objects.filter(tags=instance)
+        projects.update_search_vector()
+        projects.touch()
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_projects_on_tag_delete(sender, instance, **kwargs):
+    # The through rows go with the tag without an m2m_changed signal
+    Project.objects.filter(tags=instance).touch()
+
+
+@receiver(post_save, sender=Review)
+def update_vote_counters_on_review_save(sender, instance, created, **kwargs):
+    projects = Project.objects.filter(pk=instance.project_id)
+    previous = getattr(instance, "_loaded_value", None)
+
+    if created:
+        projects.apply_vote_delta(total=1, up=int(instance.value == "up"))
+    elif previous is not None and previous != instance.value:
+        projects.apply_vote_delta(up=1 if instance.value == "up" else -1)
+
+    instance._loaded_value = instance.value
+
+
+@receiver(post_delete, sender=Review)
+def update_vote_counters_on_review_delete(sender, instance, **kwargs):
+    value = getattr(instance, "_loaded_value", None) or instance.value
+    Project.objects.filter(pk=instance.project_id).apply_vote_delta(
+        total=-1, up=-int(value == "up")
+    )
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Review)
+@receiver(m2m_changed, sender=Project.tags.through)
+def invalidate_project_responses(sender, **kwargs):
+    invalidate_cache_tags("projects")
@@ -1,10 +1,22 @@
-from io import BytesIO
-
+import csv
+import json
+import warnings
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
 from rest_framework.test import APITestCase
 
+from apps.common.pagination import EstimatedCountPaginator
 from apps.common.utils import TestUtil
+from apps.projects.models import Project, RelatedProject, Review, Tag
 
 
 def create_test_image():
@@ -22,6 +34,9 @@ class TestProjects(APITestCase):
     project_related_url = "/api/v1/projects/<slug:slug>/related-projects/"
     featured_image_url = "/api/v1/projects/<slug:slug>/image/"
 
+    project_bulk_create_url = "/api/v1/projects/actions/bulk/"
+    project_export_url = "/api/v1/projects/actions/export/"
+
     # Tag URLs
     tag_list_url = "/api/v1/projects/tags/"
     tag_add_url = "/api/v1/projects/<slug:slug>/tags/"
@@ -31,6 +46,8 @@ class TestProjects(APITestCase):
     review_list_create_url = "/api/v1/projects/<slug:slug>/reviews/"
 
     def setUp(self):
+        cache.clear()
+
         # user
         self.user1 = TestUtil.verified_user()
         self.user2 = TestUtil.other_verified_user()
@@ -57,6 +74,195 @@ class TestProjects(APITestCase):
 
         self.assertEqual(len(response.data["data"].get("results")), 0)
 
+    def test_project_list_cursor_pagination(self):
+        project3 = TestUtil.create_project(owner=self.profile1)
+
+        # Newest first, no total count, opaque cursor links
+        response = self.client.get(
+            self.project_list_create_url, {"pagination": "cursor", "page_size": 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.data["data"]
+        self.assertNotIn("count", data)
+        self.assertIsNone(data["previous"])
+        self.assertEqual(
+            [p["slug"] for p in data["results"]], [project3.slug, self.project2.slug]
+        )
+
+        # Following the next link continues where the last page stopped
+        response = self.client.get(data["next"])
+        data = response.data["data"]
+        self.assertEqual([p["slug"] for p in data["results"]], [self.project1.slug])
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+
+        # Page-number mode is unchanged
+        response = self.client.get(self.project_list_create_url, {"page_size": 2})
+        self.assertEqual(response.data["data"]["count"], 3)
+
+    @override_settings(PAGINATION_EXACT_COUNT_THRESHOLD=1)
+    def test_project_list_approximate_count(self):
+        # Small filtered results are still counted exactly
+        response = self.client.get(self.project_list_create_url, {"tags": "fastapi"})
+        self.assertEqual(response.data["data"]["count"], 1)
+        self.assertFalse(response.data["data"]["count_is_approximate"])
+
+        # Larger results fall back to planner estimates and say so
+        response = self.client.get(self.project_list_create_url, {"search": "project"})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.data["data"]["count"], 2)
+        self.assertTrue(response.data["data"]["count_is_approximate"])
+
+    @override_settings(PAGINATION_EXACT_COUNT_THRESHOLD=1)
+    def test_project_list_pages_past_estimate(self):
+        for _ in range(2):
+            TestUtil.create_project(owner=self.profile1)
+
+        # The estimate is short of the 4 projects; pages that have rows are served
+        with patch.object(
+            EstimatedCountPaginator, "filtered_count", return_value=(2, True)
+        ):
+            for page, status_code in ((2, 200), (3, 200), (4, 200), (5, 404)):
+                response = self.client.get(
+                    self.project_list_create_url,
+                    {"search": "project", "page_size": 1, "page": page},
+                )
+                self.assertEqual(response.status_code, status_code)
+
+            response = self.client.get(
+                self.project_list_create_url,
+                {"search": "project", "page_size": 3, "page": 1},
+            )
+            self.assertEqual(len(response.data["data"]["results"]), 3)
+
+    def test_project_list_exact_count_not_cached(self):
+        response = self.client.get(self.project_list_create_url)
+        self.assertEqual(response.data["data"]["count"], 2)
+        self.assertFalse(response.data["data"]["count_is_approximate"])
+
+        TestUtil.create_project(owner=self.profile1)
+        response = self.client.get(self.project_list_create_url)
+        self.assertEqual(response.data["data"]["count"], 3)
+
+    def test_project_search(self):
+        title_match = TestUtil.create_project(owner=self.profile1)
+        title_match.title = "Weather dashboard"
+        title_match.save()
+
+        description_match = TestUtil.create_project(owner=self.profile2)
+        description_match.description = "A small dashboard for tracking habits"
+        description_match.save()
+
+        # Matches are ranked by relevance, title hits before description hits
+        response = self.client.get(self.project_list_create_url, {"search": "dashboard"})
+        self.assertEqual(response.status_code, 200)
+        slugs = [p["slug"] for p in response.data["data"]["results"]]
+        self.assertEqual(slugs, [title_match.slug, description_match.slug])
+
+        # Tags are part of the search document and stay current on tag changes
+        response = self.client.get(self.project_list_create_url, {"search": "fastapi"})
+        slugs = [p["slug"] for p in response.data["data"]["results"]]
+        self.assertEqual(slugs, [self.project1.slug])
+
+        self.project1.tags.remove(self.tag)
+        response = self.client.get(self.project_list_create_url, {"search": "fastapi"})
+        self.assertEqual(len(response.data["data"]["results"]), 0)
+
+    def test_project_tag_filter(self):
+        # Typo-tolerant match on tag names
+        response = self.client.get(self.project_list_create_url, {"tags": "fastap"})
+        self.assertEqual(response.status_code, 200)
+        slugs = [p["slug"] for p in response.data["data"]["results"]]
+        self.assertEqual(slugs, [self.project1.slug])
+
+        # Unrelated terms don't match
+        response = self.client.get(self.project_list_create_url, {"tags": "react"})
+        self.assertEqual(len(response.data["data"]["results"]), 0)
+
+    def test_project_list_tag_facets(self):
+        django = Tag.objects.create(name="django")
+        self.project1.tags.add(django)
+        self.project2.tags.add(django, self.tag)
+        self.project2.tags.remove(django, Tag.objects.create(name="unused"))
+        django.project_set.add(self.project2)
+
+        # Counters follow adds, removes and deletes
+        self.assertEqual(
+            dict(Tag.objects.values_list("name", "project_count")),
+            {"django": 2, "fastapi": 2, "unused": 0},
+        )
+
+        # Unfiltered: served from the counters
+        response = self.client.get(self.project_list_create_url, {"facets": "tags"})
+        self.assertEqual(
+            response.data["data"]["facets"]["tags"],
+            [{"name": "django", "count": 2}, {"name": "fastapi", "count": 2}],
+        )
+
+        # Filtered: grouped over the matching projects
+        self.project1.description = "Realtime chat server"
+        self.project1.save()
+        response = self.client.get(
+            self.project_list_create_url, {"facets": "tags", "search": "chat"}
+        )
+        self.assertEqual(
+            response.data["data"]["facets"]["tags"],
+            [{"name": "django", "count": 1}, {"name": "fastapi", "count": 1}],
+        )
+
+        self.project1.delete()
+        django.project_set.clear()
+        self.assertEqual(
+            dict(Tag.objects.values_list("name", "project_count")),
+            {"django": 0, "fastapi": 1, "unused": 0},
+        )
+
+        # Facets are opt-in
+        response = self.client.get(self.project_list_create_url)
+        self.assertNotIn("facets", response.data["data"])
+
+    def test_project_list_sparse_fields(self):
+        self.project1.tags.add(self.tag)
+        self.project2.tags.add(self.tag)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.project_list_create_url, {"fields": "title,slug,vote_total"}
+            )
+        self.assertEqual(response.status_code, 200)
+        for project in response.data["data"]["results"]:
+            self.assertEqual(list(project), ["title", "slug", "vote_total"])
+
+        # Dropped columns aren't read and the tags aren't prefetched
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn('"projects_project"."description"', sql)
+        self.assertNotIn('"projects_tag"', sql)
+        self.assertNotIn('"accounts_user"', sql)
+
+        response = self.client.get(
+            self.project_list_create_url, {"exclude": "description,tags"}
+        )
+        project = response.data["data"]["results"][0]
+        self.assertNotIn("description", project)
+        self.assertIn("owner", project)
+
+        # Detail and related projects take the same parameters
+        response = self.client.get(
+            self.project_r_u_d_url.replace("<slug:slug>", self.project1.slug),
+            {"fields": "slug,tags"},
+        )
+        self.assertEqual(list(response.data["data"]), ["slug", "tags"])
+        self.assertEqual(response.data["data"]["tags"][0]["name"], self.tag.name)
+
+        response = self.client.get(
+            self.project_related_url.replace("<slug:slug>", self.project1.slug),
+            {"fields": "title"},
+        )
+        self.assertEqual(response.data["data"], [{"title": self.project2.title}])
+
+        response = self.client.get(self.project_list_create_url, {"fields": "title,x"})
+        self.assertEqual(response.status_code, 422)
+
     def test_project_create_post(self):
         project_data = {
             "title": "Test project",
@@ -89,6 +295,171 @@ class TestProjects(APITestCase):
         response = self.client.post(self.project_list_create_url, data=project_data)
         self.assertEqual(response.status_code, 401)
 
+    def test_project_slug_allocation(self):
+        # Both setUp projects share a title
+        self.assertEqual(
+            [self.project1.slug, self.project2.slug], ["test-project", "test-project-2"]
+        )
+        project3 = TestUtil.create_project(owner=self.profile1)
+        self.assertEqual(project3.slug, "test-project-3")
+
+        # Saves that leave the title alone keep the slug without a lookup
+        with CaptureQueriesContext(connection) as queries:
+            project3.description = "Edited"
+            project3.save(update_fields=["description"])
+            project3.save()
+        self.assertEqual(project3.slug, "test-project-3")
+        self.assertFalse(
+            any("LIKE" in query["sql"] for query in queries.captured_queries)
+        )
+
+        # A new title gets a new slug; suffixes continue past the highest one
+        self.project2.title = "Other project"
+        self.project2.save()
+        self.assertEqual(self.project2.slug, "other-project")
+        project4 = TestUtil.create_project(owner=self.profile2)
+        self.assertEqual(project4.slug, "test-project-4")
+
+        self.project1.delete()
+        project5 = TestUtil.create_project(owner=self.profile2)
+        self.assertEqual(project5.slug, "test-project")
+
+        # Batch allocation follows the same policy: test-project-2 stays free
+        batch = [Project(owner=self.profile1, title="Test project") for _ in range(2)]
+        Project._meta.get_field("slug").allocate(batch)
+        self.assertEqual(
+            [project.slug for project in batch], ["test-project-5", "test-project-6"]
+        )
+        Project.objects.bulk_create(batch)
+        project6 = TestUtil.create_project(owner=self.profile2)
+        self.assertEqual(project6.slug, "test-project-7")
+
+    def test_project_export(self):
+        # Unauthenticated User
+        response = self.client.get(self.project_export_url)
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.project_export_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 2)
+        row = next(row for row in rows if row["slug"] == self.project1.slug)
+        self.assertEqual(row["tag_names"], [self.tag.name])
+        self.assertEqual(row["owner_username"], self.user1.username)
+        self.assertEqual(row["vote_total"], 0)
+
+        # Incremental pull from the previous export's start
+        since = response["X-Export-Started"]
+        self.project2.title = "Changed project"
+        self.project2.save()
+        response = self.client.get(
+            self.project_export_url, {"updated_since": since, "output": "csv"}
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row["title"] for row in rows], ["Changed project"])
+        self.assertEqual(rows[0]["tag_names"], "")
+
+        # Invalid parameters
+        response = self.client.get(self.project_export_url, {"output": "xml"})
+        self.assertEqual(response.status_code, 422)
+        response = self.client.get(self.project_export_url, {"updated_since": "x"})
+        self.assertEqual(response.status_code, 422)
+
+    async def test_project_export_under_asgi(self):
+        await sync_to_async(self.client.force_authenticate)(user=self.user1)
+        response = await sync_to_async(self.client.get)(self.project_export_url)
+        # Served chunk by chunk, not read into memory first
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            content = b"".join([part async for part in response])
+        self.assertEqual(len(content.splitlines()), 2)
+
+    def test_project_bulk_create(self):
+        payload = {
+            "projects": [
+                {
+                    "title": "Todo App",
+                    "description": "Tasks",
+                    "tags": ["Django", "redis", "django"],
+                },
+                {"title": "Todo App", "description": "Tasks again", "tags": ["fastapi"]},
+                {"title": "Chat", "description": "Realtime chat"},
+            ]
+        }
+
+        # Unauthenticated User
+        response = self.client.post(
+            self.project_bulk_create_url, payload, format="json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user1)
+
+        # One invalid item rejects the whole batch, errors reported per item
+        invalid = {
+            "projects": payload["projects"]
+            + [
+                {"description": "No title"},
+                {"title": "Long tag", "description": "x", "tags": ["ok", "x" * 51]},
+            ]
+        }
+        response = self.client.post(
+            self.project_bulk_create_url, invalid, format="json"
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.data["data"]["projects"],
+            [
+                {},
+                {},
+                {},
+                {"title": "This field is required."},
+                {
+                    "tags": {
+                        1: "Ensure this field has no more than 50 characters."
+                    }
+                },
+            ],
+        )
+        self.assertEqual(Project.objects.count(), 2)
+
+        response = self.client.post(
+            self.project_bulk_create_url, payload, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        data = response.data["data"]
+        self.assertEqual(
+            [item["slug"] for item in data], ["todo-app", "todo-app-2", "chat"]
+        )
+        self.assertEqual(
+            [tag["name"] for tag in data[0]["tags"]], ["django", "redis"]
+        )
+
+        # Existing tags are reused; signal-maintained state is refreshed
+        self.assertEqual(Tag.objects.filter(name="fastapi").count(), 1)
+        self.assertEqual(Tag.objects.get(name="fastapi").project_count, 2)
+        self.assertTrue(
+            Project.objects.filter(slug="chat", search_vector="realtime").exists()
+        )
+        self.assertTrue(
+            RelatedProject.objects.filter(
+                project=self.project1, related__slug="todo-app-2"
+            ).exists()
+        )
+
+        # Empty batches are rejected
+        response = self.client.post(
+            self.project_bulk_create_url, {"projects": []}, format="json"
+        )
+        self.assertEqual(response.status_code, 422)
+
     def test_project_retrieve(self):
         # Success
         response = self.client.get(
@@ -105,6 +476,15 @@ class TestProjects(APITestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+        # Slugs matching a collection action are still reachable
+        for title in ("Export", "Bulk", "Actions"):
+            project = Project.objects.create(owner=self.profile1, title=title)
+            response = self.client.get(
+                self.project_r_u_d_url.replace("<slug:slug>", project.slug)
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["data"].get("title"), title)
+
     def test_project_patch(self):
         # unauthenticated
         response = self.client.patch(
@@ -225,12 +605,76 @@ class TestProjects(APITestCase):
         self.assertEqual(response.status_code, 401)
 
     def test_related_projects_get(self):
+        django = Tag.objects.create(name="django")
+        react = Tag.objects.create(name="react")
+        self.project1.tags.add(django)
+
+        close_match = TestUtil.create_project(owner=self.profile2)
+        close_match.tags.add(self.tag, django)
+        loose_match = TestUtil.create_project(owner=self.profile2)
+        loose_match.tags.add(self.tag, react)
+        self.project2.tags.add(react)
+
+        # Ranked by tag overlap, unrelated projects left out
+        url = self.project_related_url.replace("<slug:slug>", self.project1.slug)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        slugs = [p["slug"] for p in response.data["data"]]
+        self.assertEqual(slugs, [close_match.slug, loose_match.slug])
+
+        # Kept current when tags are removed
+        close_match.tags.remove(self.tag, django)
+        response = self.client.get(url)
+        slugs = [p["slug"] for p in response.data["data"]]
+        self.assertEqual(slugs, [loose_match.slug])
+
+        # A neighbour's own tag change keeps it in lists it still belongs to
+        loose_match.tags.add(
+            *(Tag.objects.create(name=f"extra-{i}") for i in range(20))
+        )
+        response = self.client.get(url)
+        data = response.data["data"]
+        self.assertEqual([p["slug"] for p in data], [loose_match.slug])
+        self.assertAlmostEqual(
+            RelatedProject.objects.get(project=self.project1).score, 1 / 23
+        )
+
+        # Full rebuild gives the same answer
+        RelatedProject.objects.all().delete()
+        call_command("rebuild_related_projects", stdout=StringIO())
+        response = self.client.get(url)
+        slugs = [p["slug"] for p in response.data["data"]]
+        self.assertEqual(slugs, [loose_match.slug])
+
         # Non-existent project
         response = self.client.get(
             self.project_related_url.replace("<slug:slug>", "nonexistent")
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_related_projects_incremental(self):
+        a, b, d = (Tag.objects.create(name=name) for name in ("a", "b", "d"))
+        project = TestUtil.create_project(owner=self.profile2)
+        project.tags.add(b, d)
+        for _ in range(10):
+            TestUtil.create_project(owner=self.profile2).tags.add(b, d)
+        # Only shares `a`, so it is outside the project's own top ten
+        single_tag = TestUtil.create_project(owner=self.profile2)
+        single_tag.tags.add(a)
+
+        def stored():
+            return {
+                (link.project_id, link.related_id, round(link.score, 6))
+                for link in RelatedProject.objects.all()
+            }
+
+        project.tags.add(a)
+        incremental = stored()
+        self.assertIn((single_tag.pk, project.pk, round(1 / 3, 6)), incremental)
+
+        call_command("rebuild_related_projects", stdout=StringIO())
+        self.assertEqual(incremental, stored())
+
     def test_tag_get(self):
         # Unauthenticated users
         response = self.client.get(self.tag_list_url)
@@ -398,3 +842,117 @@ class TestProjects(APITestCase):
             data={"content": "Second Review", "value": "down"},
         )
         self.assertEqual(response.status_code, 404)
+
+    def test_review_vote_counters(self):
+        user3 = TestUtil.new_user()
+        profile3 = TestUtil.get_profile(user=user3)
+
+        # Counters follow review creation
+        review = TestUtil.create_review(project=self.project1, reviewer=self.profile2)
+        Review.objects.create(
+            project=self.project1, reviewer=profile3, value="down", content="Meh"
+        )
+        self.project1.refresh_from_db()
+        self.assertEqual(self.project1.vote_total, 2)
+        self.assertEqual(self.project1.up_votes, 1)
+        self.assertEqual(self.project1.vote_ratio, 50)
+
+        # Changing a vote only moves the up count
+        review = Review.objects.get(pk=review.pk)
+        review.value = "down"
+        review.save()
+        self.project1.refresh_from_db()
+        self.assertEqual(self.project1.vote_total, 2)
+        self.assertEqual(self.project1.vote_ratio, 0)
+
+        # Deleting a review (directly or in bulk) decrements the counters
+        review.delete()
+        Review.objects.filter(reviewer=profile3).delete()
+        self.project1.refresh_from_db()
+        self.assertEqual(self.project1.vote_total, 0)
+        self.assertEqual(self.project1.vote_ratio, 0)
+
+        # recount_votes rebuilds drifted counters from the reviews table
+        TestUtil.create_review(project=self.project1, reviewer=self.profile2)
+        Project.objects.update(vote_total=0, up_votes=0, vote_ratio=0)
+        Project.objects.recount_votes()
+        self.project1.refresh_from_db()
+        self.assertEqual(self.project1.vote_total, 1)
+        self.assertEqual(self.project1.vote_ratio, 100)
+
+    @override_settings(PAGINATION_EXACT_COUNT_THRESHOLD=1)
+    def test_project_list_is_read_only(self):
+        TestUtil.create_review(project=self.project1, reviewer=self.profile2)
+        TestUtil.create_review(project=self.project2, reviewer=self.profile1)
+
+        # Authenticated requests skip the response cache; warm the cached
+        # table estimate
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Project._meta.db_table}")
+        self.client.force_authenticate(user=self.user1)
+        self.client.get(self.project_list_create_url)
+
+        # page and tag prefetch - no COUNT, per-project aggregates or UPDATEs
+        with self.assertNumQueries(2):
+            response = self.client.get(self.project_list_create_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["results"][0]["vote_total"], 1)
+
+    def test_anonymous_response_cache(self):
+        detail_url = self.project_r_u_d_url.replace("<slug:slug>", self.project1.slug)
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, 200)
+
+        # Repeat anonymous GETs skip the view; only the validator lookup runs
+        with self.assertNumQueries(1):
+            cached = self.client.get(detail_url)
+        self.assertEqual(cached.data, response.data)
+
+        # Writes to a dependency invalidate the cached response
+        self.project1.description = "Updated description"
+        self.project1.save()
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data["data"]["description"], "Updated description")
+
+        TestUtil.create_review(project=self.project1, reviewer=self.profile2)
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data["data"]["vote_total"], 1)
+
+        # Authenticated users always get a fresh response
+        self.client.force_authenticate(user=self.user1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(detail_url)
+        self.assertTrue(queries.captured_queries)
+
+    def test_project_conditional_get(self):
+        detail_url = self.project_r_u_d_url.replace("<slug:slug>", self.project1.slug)
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        # A matching validator is answered from a single lookup
+        with self.assertNumQueries(1):
+            response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # Tag and review changes move the validator
+        self.project1.tags.add(Tag.objects.create(name="redis"))
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        TestUtil.create_review(project=self.project1, reviewer=self.profile2)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Missing projects still 404
+        response = self.client.get(
+            self.project_r_u_d_url.replace("<slug:slug>", "missing"),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 404)
@@ -7,6 +7,9 @@ urlpatterns = [
     path("", views.ProjectListCreateGenericView.as_view(), name="project_list_create"),
     # path("", views.ProjectListCreateView.as_view(), name="project_list_create"),
     path("tags/", views.TagListGenericView.as_view()),
+    # Collection actions sit two levels deep so they can't shadow a slug
+    path("actions/bulk/", views.ProjectBulkCreateView.as_view()),
+    path("actions/export/", views.ProjectExportView.as_view()),
     # Dynamic URLs with slug parameters (more specific first)
     path("<slug:slug>/related-projects/", views.RelatedProjectsView.as_view()),
     path("<slug:slug>/tags/", views.ProjectTagAddView.as_view()),
@@ -1,9 +1,11 @@
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Q, prefetch_related_objects
+from django.db.models.functions import Greatest
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView, ListCreateAPIView
 from rest_framework.permissions import (
     AllowAny,
@@ -13,16 +15,25 @@ from rest_framework.permissions import (
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.cache import cache_anonymous_response, conditional_response
 from apps.common.errors import ErrorCode
-from apps.common.exceptions import NotFoundError
+from apps.common.exceptions import NotFoundError, extract_errors
+from apps.common.export import EXPORT_FORMATS, ExportView
+from apps.common.filters import FullTextSearchFilter
 from apps.common.pagination import CustomPagination, DefaultPagination
 from apps.common.responses import CustomResponse
+from apps.common.schema_examples import (
+    EXPORT_PARAMETERS,
+    SPARSE_FIELDSET_PARAMETERS,
+)
 from apps.profiles.schema_examples import build_avatar_request_schema
 from apps.projects.filters import ProjectFilter
+from apps.projects.managers import SEARCH_CONFIG
 from apps.projects.mixins import HeaderMixin
 from apps.projects.permissions import IsProjectOwner
 from apps.projects.schema_examples import (
     FEATURED_IMAGE_UPDATE_RESPONSE_EXAMPLE,
+    PROJECT_BULK_CREATE_RESPONSE_EXAMPLE,
     PROJECT_CREATE_RESPONSE_EXAMPLE,
     PROJECT_DELETE_RESPONSE,
     PROJECT_DETAIL_RESPONSE_EXAMPLE,
@@ -36,9 +47,10 @@ from apps.projects.schema_examples import (
     TAG_REMOVE_RESPONSE_EXAMPLE,
 )
 
-from .models import Project, Review, Tag
+from .models import Project, RelatedProject, Review, Tag
 from .serializers import (
     FeaturedImageSerializer,
+    ProjectBulkCreateSerializer,
     ProjectCreateSerializer,
     ProjectSerializer,
     ProjectUpdateSerializer,
@@ -111,43 +123,51 @@ class ProjectListCreateView(HeaderMixin, APIView):
 
 
 class ProjectListCreateGenericView(ListCreateAPIView):
-    queryset = (
-        Project.objects.select_related("owner__user")
-        .prefetch_related("tags", "reviews")
-        .annotate(
-            total_votes=Count("reviews"),
-            up_votes=Count("reviews", filter=Q(reviews__value="up")),
-        )
-    )
+    queryset = Project.objects.all()
 
-    filter_backends = (DjangoFilterBackend, SearchFilter)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = ProjectFilter
-    search_fields = ["title", "description", "tags__name"]
+    search_config = SEARCH_CONFIG
     pagination_class = DefaultPagination
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    facet_limit = 50
 
     def get_serializer_class(self):
         if self.request.method == "POST":
             return ProjectCreateSerializer
         return ProjectSerializer
 
+    def get_queryset(self):
+        return ProjectSerializer.prepare_queryset(super().get_queryset(), self.request)
+
     @extend_schema(
         summary="Retrieve a list of user projects",
         description="This endpoint allows authenticated and unauthenticated users to view a list of all user projects in the system.",
         parameters=[
             OpenApiParameter(
                 name="search",
-                description="Search across title, description, and tags.",
+                description="Full-text search across title, tags, and description, ordered by relevance.",
             ),
             OpenApiParameter(
                 name="tags",
-                description=("Filter projects by tags."),
+                description=(
+                    "Filter projects by tag name. Typo-tolerant, ranked by similarity."
+                ),
             ),
+            OpenApiParameter(
+                name="facets",
+                description=(
+                    "Set to `tags` to include the number of matching projects per tag."
+                ),
+                enum=["tags"],
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
         ],
         operation_id="list_projects",
         tags=tags,
         responses=PROJECT_LIST_EXAMPLE,
     )
+    @cache_anonymous_response("projects")
     def get(self, request, *args, **kwargs):
         """
         Handle GET requests to retrieve projects with pagination, search, and filtering.
@@ -161,6 +181,10 @@ class ProjectListCreateGenericView(ListCreateAPIView):
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             paginated_data = self.get_paginated_response(serializer.data)
+            if request.query_params.get("facets") == "tags":
+                paginated_data.data["facets"] = {
+                    "tags": queryset.tag_facets(limit=self.facet_limit)
+                }
             return CustomResponse.success(
                 message="Projects retrieved successfully.",
                 data=paginated_data.data,
@@ -198,15 +222,96 @@ class ProjectListCreateGenericView(ListCreateAPIView):
         )
 
 
+class ProjectBulkCreateView(APIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ProjectBulkCreateSerializer
+
+    @extend_schema(
+        summary="Create several projects at once",
+        description="This endpoint allows authenticated users to import a list of projects, each with its tag names, in a single request. Every item is validated first; if any is invalid nothing is created and the errors are returned per item, in request order.",
+        tags=tags,
+        request=ProjectBulkCreateSerializer,
+        responses=PROJECT_BULK_CREATE_RESPONSE_EXAMPLE,
+    )
+    def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        if not serializer.is_valid():
+            item_errors = serializer.errors.get("projects")
+            if not isinstance(item_errors, list) or not all(
+                isinstance(errors, dict) for errors in item_errors
+            ):
+                # Not a per-item failure (e.g. empty or oversized batch)
+                raise ValidationError(serializer.errors)
+
+            return CustomResponse.error(
+                message="Validation error",
+                err_code=ErrorCode.VALIDATION_ERROR,
+                data={"projects": [extract_errors(errors) for errors in item_errors]},
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        projects = serializer.save()
+        prefetch_related_objects(projects, "tags")
+
+        return CustomResponse.success(
+            message="Projects created successfully.",
+            data=ProjectSerializer(projects, many=True).data,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
+class ProjectExportView(ExportView):
+    filename = "projects"
+    export_fields = (
+        "id",
+        "slug",
+        "title",
+        "owner_username",
+        "description",
+        "source_link",
+        "demo_link",
+        "tag_names",
+        "vote_total",
+        "up_votes",
+        "vote_ratio",
+        "created",
+        "updated",
+    )
+
+    def get_rows(self, updated_since):
+        projects = Project.objects.all()
+        if updated_since:
+            projects = projects.filter(
+                Q(updated__gte=updated_since)
+                | Q(owner__user__updated_at__gte=updated_since)
+            )
+        return projects.export_rows()
+
+    @extend_schema(
+        summary="Export the project catalog",
+        description="This endpoint allows authenticated users to download every project, with its owner, tag names and vote counters, as newline-delimited JSON or CSV. The response is streamed, so it starts right away whatever the catalog size. Pass `updated_since` to only get the projects changed since a previous export; deleted projects are not reported.",
+        tags=tags,
+        parameters=EXPORT_PARAMETERS,
+        responses={
+            (200, media_type): OpenApiTypes.STR
+            for media_type in EXPORT_FORMATS.values()
+        },
+    )
+    def get(self, request):
+        return super().get(request)
+
+
 class ProjectRetrieveUpdateDestroyView(APIView):
 
     def get_object(self, slug):
         try:
-            obj = (
-                Project.objects.prefetch_related("tags")
-                .select_related("owner__user")
-                .get(slug=slug)
-            )
+            # Only reads are trimmed to the requested fields
+            request = self.request if self.request.method == "GET" else None
+            obj = ProjectSerializer.prepare_queryset(
+                Project.objects.all(), request
+            ).get(slug=slug)
             # TODO: MIGHT CHANGE LATER IF IT AFFECTS QUERY PERFORMANCE
             if self.request.method in ["PATCH", "PUT", "DELETE"]:
                 self.check_object_permissions(
@@ -240,16 +345,28 @@ class ProjectRetrieveUpdateDestroyView(APIView):
         )
         return serializer_class(*args, **kwargs)
 
+    def get_last_modified(self, request, slug):
+        # Tag and review writes touch `updated`; the owner name lives on the user
+        return (
+            Project.objects.filter(slug=slug)
+            .annotate(last_modified=Greatest("updated", "owner__user__updated_at"))
+            .values_list("last_modified", flat=True)
+            .first()
+        )
+
     @extend_schema(
         summary="View a project details",
         description="This endpoint allows authenticated and unauthenticated users to view detailed information about a specific project.",
         tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses=PROJECT_DETAIL_RESPONSE_EXAMPLE,
     )
+    @conditional_response(get_last_modified)
+    @cache_anonymous_response("projects")
     def get(self, request, slug):
         project = self.get_object(slug)
 
-        serializer = self.get_serializer(project)
+        serializer = self.get_serializer(project, context={"request": request})
         return CustomResponse.success(
             message="Project detail retrieved successfully.",
             data=serializer.data,
@@ -294,38 +411,39 @@ class RelatedProjectsView(APIView):
     """
 
     serializer_class = ProjectSerializer
+    limit = 4
 
     @extend_schema(
         summary="View related projects for a specific project",
-        description="This endpoint allows users to view a list of projects that are related to a specific project. The related projects are determined based on project categories, tags, or other relevant factors. Users can retrieve a list of related projects, which may help them discover similar or complementary projects within the platform.",
+        description="This endpoint allows users to view a list of projects that are related to a specific project. Related projects are ranked by how much their tags overlap with this project's tags. Users can retrieve a list of related projects, which may help them discover similar or complementary projects within the platform.",
         tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses=RELATED_PROJECT_RESPONSE_EXAMPLE,
     )
+    @cache_anonymous_response("projects")
     def get(self, request, slug):
-        try:
-            project = (
-                Project.objects.select_related("owner__user")
-                .prefetch_related("tags")
-                .get(slug=slug)
-            )
+        # Precomputed neighbours, already ranked by tag overlap
+        links = list(
+            ProjectSerializer.prepare_queryset(
+                RelatedProject.objects.filter(project__slug=slug),
+                request,
+                prefix="related",
+            )[: self.limit]
+        )
+        if not links and not Project.objects.filter(slug=slug).exists():
+            raise NotFoundError(err_msg="Project not found.")
 
-            # Get related projects based on shared tags
-            related_projects = (
-                Project.objects.select_related("owner__user")
-                .filter(tags__in=project.tags.all())
-                .exclude(id=project.id)
-                .distinct()[:4]
-            )
+        related_projects = [link.related for link in links]
 
-            serializer = ProjectSerializer(related_projects, many=True)
+        serializer = ProjectSerializer(
+            related_projects, many=True, context={"request": request}
+        )
 
-            return CustomResponse.success(
-                message="Related projects retrieved successfully.",
-                data=serializer.data,
-                status_code=status.HTTP_200_OK,
-            )
-        except Project.DoesNotExist:
-            raise NotFoundError(err_msg="Project not found.")
+        return CustomResponse.success(
+            message="Related projects retrieved successfully.",
+            data=serializer.data,
+            status_code=status.HTTP_200_OK,
+        )
 
 
 class FeaturedImageUpdateView(APIView):
@@ -393,6 +511,7 @@ class TagListGenericView(ListAPIView):
     serializer_class = TagSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = DefaultPagination
+    cursor_ordering = ("name",)
 
     @extend_schema(
         summary="Retrieve a list of tags",
@@ -173,6 +173,33 @@ STORAGES = {
     },
 }
 
+# Image uploads are downscaled to IMAGE_MAX_DIMENSION on the request thread;
+# the WebP variants (name -> max width/height) are built on a worker pool
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # bytes
+IMAGE_MAX_DIMENSION = 2048  # px
+IMAGE_VARIANTS = {"thumbnail": 160, "medium": 640, "large": 1280}
+IMAGE_WORKERS = 2  # 0 builds variants inline after commit
+
+# Rows fetched per round trip (and per write to the client) by catalog exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Per-process cache; production settings swap in a shared backend
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Pub/sub behind the inbox event stream; in-memory only reaches this process
+INBOX_BROKER = {
+    "BACKEND": "apps.messaging.broker.InMemoryBroker",
+}
+INBOX_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+INBOX_STREAM_TICKET_TTL = 30  # seconds to open the stream with a ticket
+
+RESPONSE_CACHE_TIMEOUT = 60  # seconds, anonymous GET responses
+PROFILE_CACHE_TIMEOUT = 60 * 60  # seconds, per-username profile detail
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -233,6 +260,10 @@ SPECTACULAR_SETTINGS = {
 
 EMAIL_OTP_EXPIRE_MINUTES = 15
 
+# Paginated totals above this many rows come from planner estimates
+PAGINATION_EXACT_COUNT_THRESHOLD = 1000
+PAGINATION_COUNT_CACHE_TTL = 30  # seconds, unfiltered table estimates only
+
 
 JAZZMIN_SETTINGS = {
     # title of the window (Will default to current_admin_site.site_title if absent or None)
@@ -36,6 +36,20 @@ if DATABASE_URL:
         }
 
 
+# Shared across gunicorn workers so invalidation reaches every process
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("REDIS_URL"),
+    }
+}
+
+# Inbox events must reach streams held open by any worker
+INBOX_BROKER = {
+    "BACKEND": "apps.messaging.broker.RedisBroker",
+    "LOCATION": config("REDIS_URL"),
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
         minutes=60